@@ -0,0 +1,108 @@
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from timeit import timeit
+from typing import List, Tuple
+
+from project.core.constants import FILE_SYSTEM
+from project.core.path import Path
+from project.core.terminal import Terminal
+
+# commands timed, which do not touch the file system
+COMMANDS: Tuple[str, ...] = ('echo Hello, World!', 'pwd', 'sleep 0', 'help echo')
+# ls commands timed on a generated directory
+LS_COMMANDS: Tuple[str, ...] = ('ls', 'ls -l', 'ls -U', 'ls -U -l', 'ls -n 20')
+
+
+def make_terminal(eager: bool = False) -> Terminal:
+    """Create a terminal, with every command set up and its parser built if eager,
+    the way they were before commands were loaded lazily.
+    """
+    term = Terminal()
+    if eager:
+        for command in term.parser.list_commands():
+            command.parser
+    return term
+
+
+def time_startup(eager: bool = False, number: int = 100) -> float:
+    """Return the time taken to create a terminal in microseconds."""
+    return timeit(lambda: make_terminal(eager), number=number) / number * 1e6
+
+
+def time_dispatch(command: str, eager: bool = False, number: int = 2000) -> float:
+    """Return the time taken to run a command again in microseconds."""
+    term = make_terminal(eager)
+
+    def run() -> None:
+        term.run_cmd(command)
+
+    run()
+    return timeit(run, number=number) / number * 1e6
+
+
+def print_timings(number: int = 2000) -> None:
+    print(f'{"":<20}{"eager":>12}{"lazy":>12}')
+    eager, lazy = time_startup(eager=True), time_startup()
+    print(f'{"startup":<20}{eager:>9.1f} us{lazy:>9.1f} us')
+    for command in COMMANDS:
+        eager = time_dispatch(command, eager=True, number=number)
+        lazy = time_dispatch(command, number=number)
+        print(f'{command:<20}{eager:>9.1f} us{lazy:>9.1f} us')
+
+
+def time_streamed(term: Terminal, command: str) -> Tuple[float, int]:
+    """Return the time a command takes to stream all of its output in seconds,
+    and the peak memory allocated meanwhile in bytes, measured in another run
+    as tracing allocations slows it down.
+    """
+    start = perf_counter()
+    for _ in term.stream_cmd(command):
+        pass
+    elapsed = perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        for _ in term.stream_cmd(command):
+            pass
+        return elapsed, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def print_ls_timings(files: int = 100_000) -> None:
+    # the directory must be inside the file system of the terminal
+    with TemporaryDirectory(dir=FILE_SYSTEM) as directory:
+        for number in range(files):
+            (Path(directory) / f'file{number:06}.txt').touch()
+
+        term = Terminal()
+        name = Path(directory).name
+        print(f'{f"{files} files":<20}{"time":>12}{"peak memory":>16}')
+        for command in LS_COMMANDS:
+            # the first run fills the caches of the file system
+            term.run_cmd(f'{command} {name}')
+            elapsed, peak = time_streamed(term, f'{command} {name}')
+            print(f'{command:<20}{elapsed:>10.2f} s{peak / 2 ** 20:>13.1f} MB')
+
+
+def main(args: List[str]) -> None:
+    parser = ArgumentParser(prog='python -m project.core.bench')
+    parser.add_argument(
+        '-n', '--number', type=int, default=2000, help='runs of every command'
+    )
+    parser.add_argument(
+        '--ls', type=int, metavar='FILES', help='time ls on a directory of FILES files instead'
+    )
+    ns = parser.parse_args(args)
+
+    if ns.ls is not None:
+        print_ls_timings(ns.ls)
+    else:
+        print_timings(ns.number)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
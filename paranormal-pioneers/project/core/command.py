@@ -1,6 +1,6 @@
 from argparse import ArgumentParser, Namespace
 from types import FunctionType
-from typing import Any, Callable, List, Optional, Tuple, Union
+from typing import Any, Callable, Iterator, List, Optional, Tuple, Union
 
 from project.core.utils import OSException
 
@@ -51,14 +51,14 @@ def setup_parser(**kwargs) -> PatchedParser:
 
 class Command:
     def __init__(self, name: Optional[str] = None) -> None:
-        self._opt: List[Option] = []
-        self._parser: PatchedParser = setup_parser(prog=name, description=self.doc)
-
+        self._prog = name
         self._name: str = (
             self.__class__.__name__ if name is None else name
         )
 
-        self._make_args()
+        # built on first use, as most commands of a session are never run
+        self._opt: Optional[List[Option]] = None
+        self._parser: Optional[PatchedParser] = None
 
     def __repr__(self) -> str:
         return f'<Command {self.name}>'
@@ -69,20 +69,33 @@ class Command:
 
     @property
     def parser(self) -> ArgumentParser:
+        if self._parser is None:
+            self._make_args()
         return self._parser
 
+    @property
+    def options(self) -> List[Option]:
+        if self._opt is None:
+            self._make_args()
+        return self._opt
+
     @property
     def name(self) -> str:
         return self._name
 
     def execute(
-        self, term: Terminal, args: Union[str, List[str], Tuple[str]] = ()
+        self,
+        term: Terminal,
+        args: Union[str, List[str], Tuple[str]] = (),
+        stdin: Optional[Iterator[str]] = None,
     ) -> Any:
         ns: Namespace = self._parse(args)
+        # lines piped from the previous command, if any
+        ns.stdin = stdin
 
         if not ns.help:
 
-            for option in self._opt:
+            for option in self.options:
                 option._call(self, ns=ns, term=term)
 
             return self.main(ns=ns, term=term)
@@ -100,9 +113,11 @@ class Command:
         if isinstance(args, str):
             args: List[str] = args.split()
 
-        return self._parser.parse_args(args)
+        return self.parser.parse_args(args)
 
     def _make_args(self) -> None:
+        self._opt = []
+        self._parser = setup_parser(prog=self._prog, description=self.doc)
         for entry in (self.__class__.__dict__):
             maybe_option = getattr(self, entry)
             if isinstance(maybe_option, Option):
@@ -1,51 +1,132 @@
 import importlib
-from typing import Dict, List, Optional
+from functools import lru_cache
+from re import compile as re_compile
+from types import ModuleType
+from typing import Dict, List, Optional, Tuple
 
 from project.core.command import Command
-from project.core.utils import OSException
+from project.core.constants import BIN_DIR
+from project.core.utils import FS, OSException, Output, PathLike, iter_lines
 
 BIN_PATH = 'project.file_system.bin'
 Terminal = 'project.terminal.Terminal'
 
+# words, and the pipe and redirection operators, which need no spaces around them
+TOKEN = re_compile(r'>>|[|>]|[^\s|>]+')
+OPERATORS = ('|', '>', '>>')
+
+# command modules imported so far, by path
+MODULES: Dict[str, ModuleType] = {}
+
 
 class Parser:
     def __init__(self) -> None:
         self._commands: Dict[str, Command] = {}
+        # commands registered by module name, set up on first use
+        self._pending: Dict[str, str] = {}
 
     def list_commands(self) -> List[Command]:
-        return list(self._commands.values())
+        for module in list(self._pending):
+            self._setup(module)
+        return sorted(self._commands.values(), key=lambda command: command.name)
 
     def get_command(self, name: str) -> Optional[Command]:
+        if name in self._pending:
+            self._setup(name)
         return self._commands.get(name)
 
     def add_command(self, command: Command) -> None:
         self._commands[command.name] = command
 
     def load_command(self, module: str, char: str = '.') -> None:
-        path: str = make_path(module)
-        try:
-            module = importlib.import_module(path)  # type: ignore
-        except ImportError:
-            return print(f'Could not load command: {module!r}.')
-
-        if not hasattr(module, 'setup'):
+        """Register a command module, which is imported and set up when the command
+        named like the module is first used.
+        """
+        self._pending[module] = make_path(module)
+
+    def _setup(self, module: str) -> None:
+        path = self._pending.pop(module)
+        if path not in MODULES:
+            try:
+                MODULES[path] = importlib.import_module(path)
+            except ImportError:
+                return print(f'Could not load command: {module!r}.')
+
+        if not hasattr(MODULES[path], 'setup'):
             return print(f'Command module does not have setup function: {module!r}.')
 
-        module.setup(self)
+        MODULES[path].setup(self)
+
+    def execute(self, string: str, term: Terminal) -> Output:
+        """Execute a command, or a pipeline of commands separated by |,
+        each reading the lines written by the previous one,
+        optionally redirected to a file with > or appended to it with >>.
+        """
+        stages, redirect = split_pipeline(string)
 
-    def execute(self, string: str, term: Terminal) -> None:
-        args: List[str] = string.split()
+        if not stages:
+            return
 
-        if not args:
+        output = stdin = None
+        for args in stages:
+            command = self.get_command(args[0])
+            if command is None:
+                raise OSException(f'error: could not execute string: {string!r}')
+
+            output = command.execute(term=term, args=args[1:], stdin=stdin)
+            stdin = iter_lines(output)
+
+        if redirect is not None:
+            operator, target = redirect
+            path = term.fs.get_path(term.path, target, check_existing=False, check_dir=False)
+            with term.fs.open_file(path, 'a' if operator == '>>' else 'w') as file:
+                for line in stdin:
+                    if term.cancelled:
+                        break
+                    # the last line is terminated too, as it would be on screen
+                    file.write(line if line.endswith('\n') else line + '\n')
             return
 
-        commands = self._commands
-        command_name = args.pop(0)
-        if command_name in commands:
-            return commands.get(command_name).execute(term=term, args=args)
+        # a single command keeps its output as it is
+        return output if len(stages) == 1 else stdin
+
+
+def split_pipeline(string: str) -> Tuple[List[List[str]], Optional[Tuple[str, str]]]:
+    """Split a command line into the arguments of every command of the pipeline,
+    and the redirection operator and target, if any.
+    """
+    stages: List[List[str]] = [[]]
+    operator = target = None
+
+    for token in TOKEN.findall(string):
+        if token in OPERATORS and not stages[-1]:
+            raise OSException(f'error: missing command before {token!r}')
 
-        raise OSException(f'error: could not execute string: {string!r}')
+        if operator is not None:
+            if target is not None or token in OPERATORS:
+                raise OSException('error: redirection must end the command')
+            target = token
+
+        elif token == '|':
+            stages.append([])
+
+        elif token in OPERATORS:
+            operator = token
+
+        else:
+            stages[-1].append(token)
+
+    if len(stages) > 1 and not stages[-1] or operator is not None and target is None:
+        raise OSException('error: missing command or redirection target')
+
+    return [stage for stage in stages if stage], operator and (operator, target)
 
 
 def make_path(module: str) -> str:
     return ('.').join(BIN_PATH.split('.') + module.split('.'))
+
+
+@lru_cache(maxsize=None)
+def discover_commands(search_paths: Tuple[PathLike, ...] = (BIN_DIR,)) -> Tuple[str, ...]:
+    """Return the names of the command modules, the directories are only listed once."""
+    return tuple(file.stem for file in FS().resolve_commands(search_paths))
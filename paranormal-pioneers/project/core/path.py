@@ -1,22 +1,259 @@
+import errno
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path as BasePath
-from shutil import copytree, copy2 as copy
+from shutil import SameFileError, copystat, rmtree
+from threading import Event, Lock
+from time import perf_counter
+from typing import Callable, List, Optional, Set
 
 PathType = type(BasePath())
 PathCopy = 'project.core.path.Path'
 
+# bytes copied by every system call
+CHUNK_SIZE = 1 << 20
+# files of a tree copied at once
+WORKERS = 4
+# errors of the zero-copy calls meaning they cannot copy between these files
+FALLBACK_ERRORS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.ENOTSUP, errno.EBADF}
+
+
+class CopyCancelled(Exception):
+    pass
+
+
+class Progress:
+    """Files and bytes copied so far, which may be added to from several threads.
+    callback is given the progress at most every interval seconds.
+    """
+    def __init__(
+        self, callback: Optional[Callable[['Progress'], None]] = None, interval: float = 0.5
+    ) -> None:
+        self.callback = callback
+        self.interval = interval
+        self.files = 0
+        self.bytes = 0
+        self.start = perf_counter()
+        self._reported = self.start
+        self._lock = Lock()
+
+    @property
+    def elapsed(self) -> float:
+        return perf_counter() - self.start
+
+    @property
+    def rate(self) -> float:
+        """Bytes copied per second."""
+        return self.bytes / max(self.elapsed, 1e-9)
+
+    def __str__(self) -> str:
+        return (
+            f'{self.files} files, {self.bytes / 1e6:.1f} MB in {self.elapsed:.1f} s'
+            f' ({self.rate / 1e6:.1f} MB/s)'
+        )
+
+    def add(self, size: int, files: int = 0) -> None:
+        with self._lock:
+            self.bytes += size
+            self.files += files
+            now = perf_counter()
+            report = self.callback is not None and now - self._reported >= self.interval
+            if report:
+                self._reported = now
+
+        if report:
+            self.callback(self)
+
 
 class Path(PathType):
-    def copy(self, destination: BasePath) -> None:
+    def copy(
+        self,
+        destination: BasePath,
+        progress: Optional[Progress] = None,
+        cancelled: Optional[Callable[[], bool]] = None,
+        workers: int = WORKERS,
+    ) -> Progress:
+        """Copy the file, or the directory with its contents, into destination if it is
+        a directory, or to destination otherwise, with the metadata of copy2.
+        cancelled is polled between chunks and makes the copy raise CopyCancelled.
+        """
+        progress = Progress() if progress is None else progress
+        cancelled = cancelled or (lambda: False)
+
+        src = self.resolve()
+        dest = BasePath(destination).resolve()
+
         if self.is_dir():
-            func = copytree
-            destination /= self.name
+            copy_tree(src, dest / self.name, progress, cancelled, workers)
         else:
-            func = copy
+            if dest.is_dir():
+                dest /= self.name
+            copy_file(src, dest, progress, cancelled)
+
+        return progress
+
+    def move(
+        self,
+        target: BasePath,
+        progress: Optional[Progress] = None,
+        cancelled: Optional[Callable[[], bool]] = None,
+    ) -> None:
+        """Rename the path to target, or copy and remove it if target is on
+        another file system.
+        """
+        try:
+            self.rename(target)
+            return
+        except OSError as exc:
+            if exc.errno != errno.EXDEV:
+                raise
 
-        src = str(self.resolve())
-        dest = str(destination.resolve())
+        progress = Progress() if progress is None else progress
+        cancelled = cancelled or (lambda: False)
 
-        func(src, dest)
+        if self.is_dir():
+            copy_tree(self.resolve(), BasePath(target).resolve(), progress, cancelled)
+            rmtree(self)
+        else:
+            copy_file(self.resolve(), BasePath(target).resolve(), progress, cancelled)
+            self.unlink()
 
     def clone(self) -> PathCopy:
         return type(self)(self)
+
+
+def copy_file(
+    src: BasePath, dest: BasePath, progress: Progress, cancelled: Callable[[], bool]
+) -> None:
+    """Copy a file and its metadata, a partial copy is removed on failure
+    unless dest existed before.
+    """
+    try:
+        same = os.path.samefile(src, dest)
+    except OSError:
+        same = False
+    if same:
+        raise SameFileError(f'{str(src)!r} and {str(dest)!r} are the same file')
+
+    with open(src, 'rb') as fsrc:
+        try:
+            fdest, created = open(dest, 'xb'), True
+        except FileExistsError:
+            fdest, created = open(dest, 'wb'), False
+
+        try:
+            with fdest:
+                _copy_data(fsrc.fileno(), fdest.fileno(), progress, cancelled)
+            copystat(src, dest)
+
+        except BaseException:
+            if created:
+                try:
+                    os.unlink(dest)
+                except OSError:
+                    pass
+            raise
+
+    progress.add(0, files=1)
+
+
+def copy_tree(
+    src: BasePath,
+    dest: BasePath,
+    progress: Progress,
+    cancelled: Callable[[], bool],
+    workers: int = WORKERS,
+) -> None:
+    """Copy a directory like shutil.copytree, walking subdirectories and copying files
+    on a pool of threads. The first error stops the copy and is raised.
+    """
+    failed = Event()
+    directories: List[BasePath] = []
+
+    def stop() -> bool:
+        return failed.is_set() or cancelled()
+
+    def walk(src: BasePath, dest: BasePath) -> List[Callable[[], object]]:
+        """Create dest and return the tasks copying the entries of src into it."""
+        if stop():
+            raise CopyCancelled()
+
+        os.mkdir(dest)
+        directories.append(src)
+        tasks = []
+        with os.scandir(src) as it:
+            for entry in it:
+                source, target = BasePath(entry.path), dest / entry.name
+                if entry.is_dir():
+                    tasks.append(lambda s=source, t=target: walk(s, t))
+                else:
+                    tasks.append(lambda s=source, t=target: copy_file(s, t, progress, stop))
+        return tasks
+
+    error: Optional[BaseException] = None
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending: Set[Future] = {pool.submit(walk, src, dest)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    # cancellation is only reported if nothing else went wrong
+                    if error is None or isinstance(error, CopyCancelled):
+                        error = future.exception()
+                    failed.set()
+                elif not failed.is_set() and isinstance(future.result(), list):
+                    pending.update(pool.submit(task) for task in future.result())
+
+    if error is not None:
+        raise error
+
+    # copying files into the directories changed their times
+    for directory in directories:
+        copystat(directory, dest / directory.relative_to(src))
+
+
+def _copy_data(
+    infd: int, outfd: int, progress: Progress, cancelled: Callable[[], bool]
+) -> None:
+    """Copy a file in chunks, in the kernel if it can."""
+    methods = [_read_write]
+    if sys.platform.startswith('linux'):
+        methods.insert(0, _sendfile)
+    if hasattr(os, 'copy_file_range'):
+        methods.insert(0, _copy_file_range)
+
+    for method in methods:
+        copied = 0
+        try:
+            while True:
+                if cancelled():
+                    raise CopyCancelled()
+
+                size = method(infd, outfd)
+                if not size:
+                    return
+
+                copied += size
+                progress.add(size)
+
+        except OSError as exc:
+            # the next method takes over, unless this one already copied data
+            if copied or exc.errno not in FALLBACK_ERRORS:
+                raise
+
+
+def _copy_file_range(infd: int, outfd: int) -> int:
+    return os.copy_file_range(infd, outfd, CHUNK_SIZE)
+
+
+def _sendfile(infd: int, outfd: int) -> int:
+    return os.sendfile(outfd, infd, None, CHUNK_SIZE)
+
+
+def _read_write(infd: int, outfd: int) -> int:
+    data = memoryview(os.read(infd, CHUNK_SIZE))
+    written = 0
+    while written < len(data):
+        written += os.write(outfd, data[written:])
+    return len(data)
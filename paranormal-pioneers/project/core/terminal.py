@@ -1,10 +1,11 @@
 from sys import stderr, stdin, stdout
-from typing import IO, Optional, NoReturn
+from threading import Event
+from typing import IO, Iterator, Optional, NoReturn
 
 from project.core.constants import FILE_SYSTEM
 from project.core.path import Path
 from project.core.utils import FS
-from project.core.parser import Parser
+from project.core.parser import Parser, discover_commands
 
 env = dict(
     name='name',
@@ -51,6 +52,9 @@ class Terminal:
         self._parser = Parser()
         self._load_commands()
 
+        # set to stop the running command
+        self._cancel = Event()
+
     @property
     def fs(self):
         return self._fs
@@ -86,8 +90,47 @@ class Terminal:
     def start(self) -> None:
         self.loop()
 
-    def run_cmd(self, command: str) -> str:
-        return self.parser.execute(command, self)
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self) -> None:
+        """Ask the running command to stop, it may be called from any thread."""
+        self._cancel.set()
+
+    def wait(self, timeout: float) -> bool:
+        """Wait for timeout seconds, return whether the command was cancelled meanwhile."""
+        return self._cancel.wait(timeout)
+
+    def run_cmd(self, command: str) -> Optional[str]:
+        chunks = list(self.stream_cmd(command))
+        return str().join(chunks) if chunks else None
+
+    def stream_cmd(self, command: str) -> Iterator[str]:
+        """Return the output of a command in chunks, executing it as they are taken.
+        The command counts as started on this call: a cancellation from now on stops it,
+        even before the first chunk is taken on another thread.
+        """
+        self._cancel.clear()
+        return self._stream_cmd(command)
+
+    def _stream_cmd(self, command: str) -> Iterator[str]:
+        """Execute a command and yield its output in chunks, as it is produced.
+        Commands may return a string or an iterable of strings.
+        """
+        result = self.parser.execute(command, self)
+
+        if result is None:
+            return
+
+        if isinstance(result, str):
+            yield result
+            return
+
+        for chunk in result:
+            if self.cancelled:
+                break
+            yield chunk
 
     def loop(self) -> NoReturn:
         # main loop here; we might change it soon.
@@ -97,8 +140,11 @@ class Terminal:
             ps = self.format_ps()
             command = input(ps)
 
+            output = False
             try:
-                result = self.parser.execute(command, self)
+                for chunk in self.stream_cmd(command):
+                    print(chunk, end=str())
+                    output = True
 
             except BaseException as exc:
                 if isinstance(exc, (KeyboardInterrupt, SystemExit)):
@@ -107,8 +153,8 @@ class Terminal:
                 print(f'{exc}')
 
             else:
-                if result is not None:
-                    print(result)
+                if output:
+                    print()
 
     def format_ps(self, end: Optional[str] = None) -> str:
         if end is None:
@@ -124,6 +170,5 @@ class Terminal:
         )
 
     def _load_commands(self) -> None:
-        for file in self.fs.resolve_commands():
-            name = file.name.replace(file.suffix, str())
+        for name in discover_commands():
             self.parser.load_command(name)
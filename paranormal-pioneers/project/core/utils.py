@@ -1,11 +1,12 @@
 from functools import wraps
-from typing import Any, Callable, IO, Generator, Iterable, List, Union
+from typing import Any, Callable, IO, Generator, Iterable, Iterator, List, Optional, Union
 
 from project.core.constants import BIN_DIR, CANNOT_EXIT_ENV, FILE_SYSTEM
 from project.core.path import Path
 
 Function = Callable[[Any], Any]
 PathLike = Union[str, Path]
+Output = Optional[Union[str, Iterable[str]]]
 FS = 'project.core.utils.FS'
 
 ROOT = FILE_SYSTEM.resolve()
@@ -29,11 +30,38 @@ class OSException(Exception):
         super().__init__(message)
 
 
+def iter_lines(output: Output) -> Iterator[str]:
+    """Split the output of a command, a string or chunks of it, into lines with their ends."""
+    if output is None:
+        return
+
+    if isinstance(output, str):
+        output = (output,)
+
+    pieces: List[str] = []
+    for chunk in output:
+        start, end = 0, chunk.find('\n')
+        while end != -1:
+            pieces.append(chunk[start:end + 1])
+            yield str().join(pieces)
+            pieces.clear()
+            start, end = end + 1, chunk.find('\n', end + 1)
+
+        if start < len(chunk):
+            pieces.append(chunk[start:])
+
+    if pieces:
+        yield str().join(pieces)
+
+
 class FS:
     @resolve_path()
-    def open_file(self, path: PathLike, mode: str) -> IO:
-        if path.exists():
-            return path.open(mode)
+    def open_file(self, path: PathLike, mode: str, encoding: Optional[str] = 'utf-8') -> IO:
+        # files are created when written to
+        if path.exists() or mode.startswith(('w', 'a', 'x')):
+            if path.is_dir():
+                raise OSException(f'error: {path.name} is a directory')
+            return path.open(mode, encoding=None if 'b' in mode else encoding)
         raise OSException(f'error: file {path} does not exist')
 
     @resolve_path()
@@ -1,4 +1,5 @@
 from argparse import Namespace
+from typing import Iterator, TextIO
 
 from project.core import command
 from project.core.parser import Parser
@@ -7,7 +8,7 @@ from project.core.utils import OSException
 
 
 class Cat(command.Command):
-    """Print contents of a file.
+    """Print contents of a file, or the lines piped to it.
     Example: cat .termrc
     """
     def __init__(self):
@@ -15,19 +16,29 @@ class Cat(command.Command):
 
     @command.option('path', nargs='?')
     def handle_path(self, ns: Namespace, term: Terminal) -> None:
-        if ns.path is None:
+        self.path = None
+        if ns.path is not None:
+            self.path = term.fs.get_path(term.path, ns.path, check_dir=False)
+        elif ns.stdin is None:
             raise OSException('error: path not specified')
-        self.path = term.fs.get_path(term.path, ns.path, check_dir=False)
 
-    def main(self, ns: Namespace, term: Terminal) -> None:
+    def main(self, ns: Namespace, term: Terminal) -> Iterator[str]:
+        if self.path is None:
+            return ns.stdin
+
         try:
             if self.path.is_file():
-                return self.path.read_text('utf-8')
+                return read_lines(term.fs.open_file(self.path, 'r'))
             raise OSException('error: not a file')
 
         except OSError:
             raise OSException('error: no such file') from None
 
 
+def read_lines(file: TextIO) -> Iterator[str]:
+    with file:
+        yield from file
+
+
 def setup(parser: Parser) -> None:
     parser.add_command(Cat())
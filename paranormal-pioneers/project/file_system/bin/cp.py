@@ -1,13 +1,20 @@
 from argparse import Namespace
+from functools import partial
+from queue import Queue
+from threading import Thread
+from typing import Callable, Iterator, List, Optional
 
 from project.core import command
 from project.core.parser import Parser
+from project.core.path import CopyCancelled, Path, Progress
 from project.core.terminal import Terminal
 from project.core.utils import OSException
 
 
 class Copy(command.Command):
-    """Move files or directories to another directory."""
+    """Copy files or directories to another directory.
+    Example: cp -p examples backup
+    """
     def __init__(self) -> None:
         super().__init__(name='cp')
 
@@ -23,15 +30,58 @@ class Copy(command.Command):
             for path in paths
         )
 
-    def main(self, ns: Namespace, term: Terminal) -> None:
+    @command.option(
+        '-p', '--progress', action='store_true', default=False,
+        help='Report files and bytes copied while copying.'
+    )
+    def handle_progress(self, ns: Namespace, term: Terminal) -> None:
+        self.progress = ns.progress
+
+    def main(self, ns: Namespace, term: Terminal) -> Optional[Iterator[str]]:
         if not self.dest.is_dir():
             raise OSException('error: destination is not a directory')
 
-        for src in self.srcs:
-            try:
-                src.copy(self.dest)
-            except OSError:
-                raise OSException('error: failed to copy path') from None
+        copy = partial(copy_paths, self.srcs, self.dest, term)
+        if self.progress:
+            return report_progress(copy)
+
+        copy(Progress())
+
+
+def copy_paths(srcs: List[Path], dest: Path, term: Terminal, progress: Progress) -> None:
+    for src in srcs:
+        try:
+            src.copy(dest, progress, cancelled=lambda: term.cancelled)
+        except CopyCancelled:
+            raise OSException('error: copy cancelled') from None
+        except OSError:
+            raise OSException('error: failed to copy path') from None
+
+
+def report_progress(copy: Callable[[Progress], None]) -> Iterator[str]:
+    """Copy on another thread, yielding the progress as it is reported."""
+    reports: Queue = Queue()
+    progress = Progress(lambda progress: reports.put(str(progress)))
+
+    def run() -> None:
+        try:
+            copy(progress)
+        except Exception as exc:
+            reports.put(exc)
+        else:
+            reports.put(None)
+
+    Thread(target=run, daemon=True).start()
+
+    while True:
+        report = reports.get()
+        if report is None:
+            break
+        if isinstance(report, Exception):
+            raise report
+        yield f'{report}\n'
+
+    yield f'copied {progress}'
 
 
 def setup(parser: Parser) -> None:
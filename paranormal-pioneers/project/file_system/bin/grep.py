@@ -0,0 +1,50 @@
+import re
+from argparse import Namespace
+from typing import Iterator
+
+from project.core import command
+from project.core.parser import Parser
+from project.core.terminal import Terminal
+from project.core.utils import OSException
+from project.file_system.bin.cat import read_lines
+
+
+class Grep(command.Command):
+    """Print lines of a file, or the lines piped to it, matching a pattern.
+    Example: ls -a | grep -i py
+    """
+    def __init__(self) -> None:
+        super().__init__(name='grep')
+
+    @command.option('-i', '--ignore-case', action='store_true', default=False)
+    def handle_ignore_case(self, ns: Namespace, term: Terminal) -> None:
+        self.flags = re.IGNORECASE if ns.ignore_case else 0
+
+    @command.option('pattern', nargs='?')
+    def handle_pattern(self, ns: Namespace, term: Terminal) -> None:
+        if ns.pattern is None:
+            raise OSException('error: pattern not specified')
+
+        try:
+            self.pattern = re.compile(ns.pattern, self.flags)
+        except re.error as exc:
+            raise OSException(f'error: invalid pattern: {exc}') from None
+
+    @command.option('path', nargs='?')
+    def handle_path(self, ns: Namespace, term: Terminal) -> None:
+        self.lines = ns.stdin
+        if ns.path is not None:
+            path = term.fs.get_path(term.path, ns.path, check_dir=False)
+            if not path.is_file():
+                raise OSException('error: not a file')
+            self.lines = read_lines(term.fs.open_file(path, 'r'))
+
+        elif ns.stdin is None:
+            raise OSException('error: path not specified')
+
+    def main(self, ns: Namespace, term: Terminal) -> Iterator[str]:
+        return filter(self.pattern.search, self.lines)
+
+
+def setup(parser: Parser) -> None:
+    parser.add_command(Grep())
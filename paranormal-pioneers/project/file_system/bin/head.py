@@ -0,0 +1,42 @@
+from argparse import Namespace
+from itertools import islice
+from typing import Iterator
+
+from project.core import command
+from project.core.parser import Parser
+from project.core.terminal import Terminal
+from project.core.utils import OSException
+from project.file_system.bin.cat import read_lines
+
+
+class Head(command.Command):
+    """Print the first lines of a file, or of the lines piped to it.
+    Example: cat .termrc | head -n 3
+    """
+    def __init__(self) -> None:
+        super().__init__(name='head')
+
+    @command.option('-n', '--lines', type=int, default=10)
+    def handle_lines(self, ns: Namespace, term: Terminal) -> None:
+        if ns.lines < 0:
+            raise OSException('error: number of lines must not be negative')
+        self.count = ns.lines
+
+    @command.option('path', nargs='?')
+    def handle_path(self, ns: Namespace, term: Terminal) -> None:
+        self.lines = ns.stdin
+        if ns.path is not None:
+            path = term.fs.get_path(term.path, ns.path, check_dir=False)
+            if not path.is_file():
+                raise OSException('error: not a file')
+            self.lines = read_lines(term.fs.open_file(path, 'r'))
+
+        elif ns.stdin is None:
+            raise OSException('error: path not specified')
+
+    def main(self, ns: Namespace, term: Terminal) -> Iterator[str]:
+        return islice(self.lines, self.count)
+
+
+def setup(parser: Parser) -> None:
+    parser.add_command(Head())
@@ -1,17 +1,25 @@
+import os
+import stat
 from argparse import Namespace
 from datetime import datetime
-from typing import Iterator, List
+from functools import lru_cache
+from heapq import nsmallest
+from itertools import islice, zip_longest
+from typing import Iterable, Iterator, List, Optional
 
 from project.core import command
 from project.core.parser import Parser
 from project.core.terminal import Terminal
-from project.core.utils import PathLike
+from project.core.utils import OSException
 
 type_form = '<{}>'
 time_form = '({}; {})'
 size_form = '[{}]'
 name_form = '{}'
 
+# entries laid out at once; columns only widen from one block to the next
+BLOCK_SIZE = 1024
+
 
 class LS(command.Command):
     """List all files in a given directory.
@@ -32,63 +40,126 @@ class LS(command.Command):
     def handle_long(self, ns: Namespace, term: Terminal) -> None:
         self.long = ns.long
 
-    def main(self, ns: Namespace, term: Terminal) -> str:
-        entries = []
+    @command.option(
+        '-U', '--unsorted', action='store_true', default=False,
+        help='List entries in directory order, as they are read.'
+    )
+    def handle_unsorted(self, ns: Namespace, term: Terminal) -> None:
+        self.unsorted = ns.unsorted
 
-        for path in sorted(term.fs.iter_dir(self.dir)):
-            name = path.name
+    @command.option('-n', '--limit', type=int, default=None, help='List at most LIMIT entries.')
+    def handle_limit(self, ns: Namespace, term: Terminal) -> None:
+        if ns.limit is not None and ns.limit < 0:
+            raise OSException('error: number of entries must not be negative')
+        self.limit = ns.limit
 
-            if name.startswith('.') and not self.show_all:
-                continue
+    def main(self, ns: Namespace, term: Terminal) -> Iterator[str]:
+        entries = scan(self.dir, self.show_all, self.unsorted, self.limit)
+        rows = (_format(entry, self.long) for entry in entries)
+        return _lines(expand(rows))
 
-            typeof = _define_type(path)
 
-            if self.long:
-                stat = path.stat()
-                to_add = [
-                    type_form.format(typeof),
-                    time_form.format(
-                        _human_timestamp(stat.st_ctime), _human_timestamp(stat.st_mtime)
-                    ),
-                    size_form.format(stat.st_size),
-                    name_form.format(name),
-                ]
+def setup(parser: Parser) -> None:
+    parser.add_command(LS())
 
-            else:
-                to_add = [type_form.format(typeof), name_form.format(name)]
 
-            entries.append(to_add)
+def scan(
+    path: os.PathLike, show_all: bool = False, unsorted: bool = False, limit: Optional[int] = None
+) -> Iterator[os.DirEntry]:
+    """Yield the entries of a directory, sorted by name unless unsorted.
+    The directory is read lazily when unsorted, and only the first limit entries
+    are kept while sorting when limited.
+    """
+    with os.scandir(path) as it:
+        entries = (entry for entry in it if show_all or not entry.name.startswith('.'))
 
-        return ('\n').join((' ').join(strings) for strings in expand(entries))
+        if unsorted:
+            yield from islice(entries, limit)
+            return
 
+        if limit is not None:
+            entries = nsmallest(limit, entries, key=_name)
+        else:
+            entries = sorted(entries, key=_name)
+
+    # entries are dropped once listed, with the stat data they cache
+    entries.reverse()
+    while entries:
+        yield entries.pop()
+
+
+def _name(entry: os.DirEntry) -> str:
+    return entry.name
 
-def setup(parser: Parser) -> None:
-    parser.add_command(LS())
 
+def _format(entry: os.DirEntry, long: bool) -> List[str]:
+    typeof = _define_type(entry)
 
-def _make(max_len: int, column: List[str], fill: str) -> Iterator[str]:
-    return (string + (fill * (max_len - len(string))) for string in column)
+    if long:
+        info = entry.stat()
+        return [
+            type_form.format(typeof),
+            time_form.format(
+                _human_timestamp(info.st_ctime), _human_timestamp(info.st_mtime)
+            ),
+            size_form.format(info.st_size),
+            name_form.format(entry.name),
+        ]
 
+    return [type_form.format(typeof), name_form.format(entry.name)]
 
-def _gen(strings: List[List[str]], fill: str = ' ') -> Iterator[Iterator[str]]:
-    for column in zip(*strings):
-        yield _make(max(map(len, column)), column, fill)
 
+def _lines(rows: Iterable[List[str]]) -> Iterator[str]:
+    """Yield rows as lines, the last one without a line end."""
+    rows = iter(rows)
+    for row in rows:
+        yield (' ').join(row)
+        break
 
-def expand(strings: List[List[str]], fill: str = ' ') -> List[List[str]]:
-    return zip(*_gen(strings, fill))
+    for row in rows:
+        yield '\n' + (' ').join(row)
 
 
+def expand(rows: Iterable[List[str]], fill: str = ' ') -> Iterator[List[str]]:
+    """Pad every column of the rows to the width of its longest string so far,
+    laying them out a block at a time.
+    """
+    rows = iter(rows)
+    widths: List[int] = []
+
+    while True:
+        block = list(islice(rows, BLOCK_SIZE))
+        if not block:
+            return
+
+        block_widths = (max(map(len, column)) for column in zip(*block))
+        widths = [max(pair) for pair in zip_longest(widths, block_widths, fillvalue=0)]
+
+        for row in block:
+            yield [string + fill * (width - len(string)) for string, width in zip(row, widths)]
+
+
+@lru_cache(maxsize=4096)
 def _human_timestamp(seconds: int) -> str:
     return datetime.fromtimestamp(seconds).strftime('%y.%m.%d %H:%M:%S')
 
 
-def _define_type(path: PathLike) -> str:
-    if path.is_dir():
+def _define_type(entry: os.DirEntry) -> str:
+    # is_dir, is_file and is_symlink are answered from the directory listing
+    if entry.is_dir():
         return 'dir'
-    elif path.is_socket():
+    elif entry.is_file() and not entry.is_symlink():
+        return 'file'
+    elif _is_socket(entry):
         return 'socket'
-    elif path.is_symlink():
+    elif entry.is_symlink():
         return 'link'
     else:
         return 'file'
+
+
+def _is_socket(entry: os.DirEntry) -> bool:
+    try:
+        return stat.S_ISSOCK(entry.stat().st_mode)
+    except OSError:
+        return False
@@ -2,6 +2,7 @@ from argparse import Namespace
 
 from project.core import command
 from project.core.parser import Parser
+from project.core.path import CopyCancelled
 from project.core.terminal import Terminal
 from project.core.utils import OSException
 
@@ -29,14 +30,16 @@ class MV(command.Command):
         try:
             if self.dest.is_dir():
                 for src in self.srcs:
-                    src.rename(self.dest / src.name)
+                    src.move(self.dest / src.name, cancelled=lambda: term.cancelled)
             else:
                 # rename attempt
                 src = self.srcs.pop()
                 if self.srcs:
                     raise OSException('error: cannot rename several files')
 
-                src.rename(self.dest)
+                src.move(self.dest, cancelled=lambda: term.cancelled)
+        except CopyCancelled:
+            raise OSException('error: move cancelled') from None
         except OSError:
             raise OSException('error: failed to move/rename paths')
 
@@ -1,5 +1,4 @@
 from argparse import Namespace
-from time import sleep
 
 from project.core import command
 from project.core.parser import Parser
@@ -19,7 +18,7 @@ class Sleep(command.Command):
 
     def main(self, ns: Namespace, term: Terminal) -> str:
         try:
-            sleep(self.delay)
+            term.wait(self.delay)
         except KeyboardInterrupt:
             return
 
@@ -0,0 +1,74 @@
+from argparse import ArgumentParser
+from io import BytesIO, StringIO
+from time import perf_counter
+from typing import Callable, Dict, List, Tuple
+
+from project.core.constants import FILE_SYSTEM
+from project.langs.brainfuck import codegen
+from project.langs.brainfuck.impl import brainfuck
+
+# name: (code, input)
+CORPUS: Dict[str, Tuple[str, bytes]] = {
+    'hello world': (
+        (FILE_SYSTEM / 'examples' / 'brainfuck' / 'helloworld.bf').read_text(),
+        b'',
+    ),
+    'squares': (
+        '++++[>+++++<-]>[<+++++>-]+<+[>[>+>+<<-]++>>[<<+>>-]>>>[-]++>[-]+>>>+[[-]++++++>>>]<<<'
+        '[[<++++++++<++>>-]+<.<[>----<-]<]<<[>>>>>[>>>[-]+++++++++<[>-<-]+++++++++>[-[<->-]+'
+        '[<<<]]<[>+<-]>]<<-]<<-]',
+        b'',
+    ),
+    'nested loops': (
+        '>++[<+++++++++++++>-]<[[>+>+<<-]>[<+>-]++++++++[>++++++++<-]>.[-]<<>++++++++++'
+        '[>++++++++++[>++++++++++[>++++++++++[>+++++[-]<-]<-]<-]<-]<-]++++++++++.',
+        b'',
+    ),
+    'rot13': (
+        '-,+[-[>>++++[>++++++++<-]<+<-[>+>+>-[>>>]<[[>+<-]>>+>]<<<<<-]]>>>[-]+>--[-[<->+++[-]]]'
+        '<[++++++++++++<[>-[>+>>]>[+[<+>-]>+>>]<<<<<-]>>[<+>-]>[-[-<<[-]>>]<<[<<->>-]>>]<<'
+        '[<<+>>-]]<[-]<.[-]<-,+]',
+        b'Hello, World! The quick brown fox jumps over the lazy dog.\n' * 20,
+    ),
+    'tape growth': (
+        '>' * 40000 + '++++++++[>++++++++<-]>+.',
+        b'',
+    ),
+}
+
+Runner = Callable[..., None]
+
+
+def run_program(run: Runner, code: str, stdin: bytes) -> Tuple[float, str]:
+    """Run code with the runner, return its wall time and output."""
+    stdout = StringIO()
+    start = perf_counter()
+    run(code, stdin=BytesIO(stdin), stdout=stdout)
+    return perf_counter() - start, stdout.getvalue()
+
+
+def print_corpus_timings(repeat: int = 3) -> None:
+    print(f'{"program":<16}{"interpreter":>14}{"codegen":>12}{"cached":>12}{"speedup":>10}')
+    for name, (code, stdin) in CORPUS.items():
+        codegen.CACHE.clear()
+        interpreted, expected = run_program(brainfuck, code, stdin)
+        first, output = run_program(codegen.run, code, stdin)
+        assert output == expected, f'{name}: codegen output differs from the interpreter'
+        cached = min(run_program(codegen.run, code, stdin)[0] for _ in range(repeat))
+        print(
+            f'{name:<16}{interpreted * 1e3:>11.2f} ms{first * 1e3:>9.2f} ms'
+            f'{cached * 1e3:>9.2f} ms{interpreted / cached:>9.1f}x'
+        )
+
+
+def main(args: List[str]) -> None:
+    parser = ArgumentParser(prog='python -m project.langs.brainfuck bench')
+    parser.add_argument(
+        '-r', '--repeat', type=int, default=3, help='runs of cached programs, the best is kept'
+    )
+    ns = parser.parse_args(args)
+    print_corpus_timings(repeat=ns.repeat)
+
+
+if __name__ == '__main__':
+    print_corpus_timings()
@@ -0,0 +1,172 @@
+import sys
+from collections import OrderedDict
+from hashlib import sha256
+from types import CodeType
+from typing import BinaryIO, List, Optional, TextIO
+
+from project.langs.brainfuck.impl import (
+    ADD, BLOCK_SIZE, CLEAR, INPUT, JUMP_NONZERO, JUMP_ZERO, MOVE, MULTIPLY, OUTPUT, SCAN,
+    TAPE_SIZE, Op, _reach, _reader, compile_ir, execute
+)
+
+# code objects of the most recently run programs, by hash of their source
+CACHE: 'OrderedDict[str, Optional[CodeType]]' = OrderedDict()
+CACHE_SIZE = 64
+# python refuses to compile more than 20 nested blocks,
+# one is taken by the try and one may be needed by a scan
+MAX_DEPTH = 18
+
+
+def run(
+    code: str,
+    stdin: Optional[BinaryIO] = None,
+    stdout: Optional[TextIO] = None,
+    wrap: bool = True,
+    tape_size: int = TAPE_SIZE,
+) -> None:
+    """Evaluate brainfuck code by translating it to python,
+    with the same semantics as project.langs.brainfuck.brainfuck.
+    """
+    stdout = sys.stdout if stdout is None else stdout
+    program = compile_code(code, wrap)
+
+    if program is None:
+        # too deeply nested for python
+        return execute(compile_ir(code), stdin, stdout, wrap, tape_size)
+
+    def write(out: bytearray) -> None:
+        stdout.write(out.decode('latin-1'))
+        stdout.flush()
+        out.clear()
+
+    namespace = dict(read=_reader(stdin), write=write, grow=_grow, tape_size=tape_size)
+    exec(program, namespace)
+
+
+def compile_code(code: str, wrap: bool = True) -> Optional[CodeType]:
+    """Return the code object running brainfuck code,
+    or None if it nests loops deeper than python allows.
+    """
+    key = sha256(f'{int(wrap)}{code}'.encode()).hexdigest()
+
+    if key in CACHE:
+        CACHE.move_to_end(key)
+        return CACHE[key]
+
+    ir = compile_ir(code)
+    program = None
+    if _depth(ir) <= MAX_DEPTH:
+        program = compile(to_python(ir, wrap), f'<brainfuck {key[:8]}>', 'exec')
+
+    CACHE[key] = program
+    if len(CACHE) > CACHE_SIZE:
+        CACHE.popitem(last=False)
+
+    return program
+
+
+def to_python(ir: List[Op], wrap: bool = True) -> str:
+    """Translate compiled brainfuck code to python source.
+    The source expects read, write, grow and tape_size as globals.
+    """
+    left, right = _reach(ir)
+    # the tape and the pointer are locals of a function, which are much faster than globals
+    lines = [
+        'def program():',
+        f'    t = bytearray({left} + tape_size + {right})',
+        f'    p = {left}',
+        '    out = bytearray()',
+        '    try:',
+    ]
+    indent = 2
+
+    def emit(*statements: str) -> None:
+        lines.extend('    ' * indent + statement for statement in statements)
+
+    def add(index: str, value: str) -> None:
+        if wrap:
+            emit(f't[{index}] = (t[{index}] + {value}) & 255')
+        else:
+            emit(
+                f'v = t[{index}] + {value}',
+                'if v & -256:',
+                f'    raise ValueError(f"cell overflow at {{p - {left}}}")',
+                f't[{index}] = v',
+            )
+
+    def check_pointer(step: int) -> None:
+        if step < 0:
+            emit(f'if p < {left}:', '    raise ValueError("pointer moved left of the tape")')
+        else:
+            emit(f'if p + {right} >= len(t):', f'    grow(t, p + {right})')
+
+    for op, a, b in ir:
+        if op == ADD:
+            add(f'p + {a}', str(b))
+
+        elif op == MOVE:
+            emit(f'p += {a}')
+            check_pointer(a)
+
+        elif op == JUMP_ZERO:
+            emit('while t[p]:')
+            indent += 1
+
+        elif op == JUMP_NONZERO:
+            # keeps empty loops valid
+            emit('pass')
+            indent -= 1
+
+        elif op == MULTIPLY:
+            emit(f'm = t[p + {b}]', 'if m:')
+            indent += 1
+            for offset, factor in a:
+                add(f'p + {offset}', f'm * {factor}')
+            emit(f't[p + {b}] = 0')
+            indent -= 1
+
+        elif op == CLEAR:
+            emit(f't[p + {a}] = 0')
+
+        elif op == SCAN:
+            if a == 1:
+                emit('p = t.find(0, p)', 'if p == -1:', '    p = len(t)')
+            elif a == -1:
+                emit('p = t.rfind(0, 0, p + 1)')
+            else:
+                emit('while t[p]:', f'    p += {a}')
+                indent += 1
+                check_pointer(a)
+                indent -= 1
+            check_pointer(a)
+
+        elif op == OUTPUT:
+            emit(
+                f'out.append(t[p + {a}])',
+                f'if len(out) >= {BLOCK_SIZE}:',
+                '    write(out)',
+            )
+
+        elif op == INPUT:
+            emit('write(out)', 'c = read()', 'if c is not None:', f'    t[p + {a}] = c')
+
+    emit('pass')
+    lines.extend(('    finally:', '        write(out)', '', 'program()'))
+    return '\n'.join(lines) + '\n'
+
+
+def _depth(ir: List[Op]) -> int:
+    """Return how deeply loops of the IR are nested."""
+    depth = deepest = 0
+    for op, _, _ in ir:
+        if op == JUMP_ZERO:
+            depth += 1
+            deepest = max(deepest, depth)
+        elif op == JUMP_NONZERO:
+            depth -= 1
+    return deepest
+
+
+def _grow(tape: bytearray, index: int) -> None:
+    """Make index a valid index of the tape, at least doubling its size."""
+    tape.extend(bytes(max(len(tape), index + 1 - len(tape))))
@@ -1,47 +1,180 @@
+import sys
 from collections import defaultdict
-from typing import Dict
+from typing import BinaryIO, Callable, Dict, List, Optional, TextIO, Tuple
 
 from project.langs.brainfuck import getch
 
 CHARS = '+-><[].,'
 
+TAPE_SIZE = 30000
+# output is written in blocks of this many characters
+BLOCK_SIZE = 4096
 
-def brainfuck(code: str) -> None:
-    """Evaluate brainfuck code."""
-    code = cleanup(code)
-    bracemap = build_bracemap(code)
-    cells, codeptr, cellptr = defaultdict(int), 0, 0
+# IR operations, as (operation, a, b) tuples
+ADD = 0  # add b to the cell at offset a
+MOVE = 1  # move the pointer by a
+JUMP_ZERO = 2  # jump past the matching JUMP_NONZERO, if the cell is zero
+JUMP_NONZERO = 3  # jump past the matching JUMP_ZERO, if the cell is not zero
+MULTIPLY = 4  # add the cell at offset b times factor to every (offset, factor) in a, clear it
+CLEAR = 5  # set the cell at offset a to zero
+SCAN = 6  # move the pointer by a until the cell is zero
+OUTPUT = 7  # print the cell at offset a
+INPUT = 8  # read the cell at offset a
 
-    while codeptr < len(code):
-        char = code[codeptr]
+Op = Tuple[int, object, int]
 
-        if char == '+':
-            cells[cellptr] += 1
 
-        elif char == '-':
-            cells[cellptr] -= 1
+def brainfuck(
+    code: str,
+    stdin: Optional[BinaryIO] = None,
+    stdout: Optional[TextIO] = None,
+    wrap: bool = True,
+) -> None:
+    """Evaluate brainfuck code.
+    , reads bytes from stdin, or from the keyboard if it is not given,
+    and leaves the cell unchanged at the end of the input.
+    Cells wrap around on overflow, unless wrap is False, which makes overflow an error.
+    """
+    execute(compile_ir(code), stdin, stdout, wrap)
 
-        elif char == '>':
-            cellptr += 1
 
-        elif char == '<':
-            cellptr -= 1
+def execute(
+    ir: List[Op],
+    stdin: Optional[BinaryIO] = None,
+    stdout: Optional[TextIO] = None,
+    wrap: bool = True,
+    tape_size: int = TAPE_SIZE,
+) -> None:
+    """Run compiled brainfuck code."""
+    stdout = sys.stdout if stdout is None else stdout
+    read = _reader(stdin)
+    # offsets are accessed without bound checks, so the tape is kept wide enough around
+    # the pointer for the furthest of them; the cells left of the origin are a margin too
+    left, right = _reach(ir)
+    tape, codeptr, cellptr = bytearray(left + tape_size + right), 0, left
+    out = bytearray()
 
-        elif char == '[' and not cells[cellptr]:
-            codeptr = bracemap[codeptr]
+    def overflow() -> None:
+        raise ValueError(f'cell overflow at {cellptr - left}')
 
-        elif char == ']' and cells[cellptr]:
-            codeptr = bracemap[codeptr]
+    def check_pointer() -> None:
+        nonlocal tape
+        if cellptr < left:
+            raise ValueError('pointer moved left of the tape')
+        if cellptr + right >= len(tape):
+            tape += bytes(max(len(tape), cellptr + right + 1 - len(tape)))
 
-        elif char == '.':
-            # TODO: change that to what we are going to use
-            print(chr(cells[cellptr]), end='')
+    try:
+        while codeptr < len(ir):
+            op, a, b = ir[codeptr]
 
-        elif char == ',':
-            raise ValueError(", is not supported")
-            cells[cellptr] = ord(getch.getch())
+            if op == ADD:
+                value = tape[cellptr + a] + b
+                if value & -256:
+                    if not wrap:
+                        overflow()
+                    value &= 255
+                tape[cellptr + a] = value
 
-        codeptr += 1
+            elif op == MOVE:
+                cellptr += a
+                check_pointer()
+
+            elif op == JUMP_ZERO:
+                if not tape[cellptr]:
+                    codeptr = b
+
+            elif op == JUMP_NONZERO:
+                if tape[cellptr]:
+                    codeptr = b
+
+            elif op == MULTIPLY:
+                value = tape[cellptr + b]
+                if value:
+                    for offset, factor in a:
+                        result = tape[cellptr + offset] + value * factor
+                        if result & -256:
+                            if not wrap:
+                                overflow()
+                            result &= 255
+                        tape[cellptr + offset] = result
+                    tape[cellptr + b] = 0
+
+            elif op == CLEAR:
+                tape[cellptr + a] = 0
+
+            elif op == SCAN:
+                if a == 1:
+                    cellptr = tape.find(0, cellptr)
+                    if cellptr == -1:
+                        cellptr = len(tape)
+                elif a == -1:
+                    cellptr = tape.rfind(0, 0, cellptr + 1)
+                else:
+                    while tape[cellptr]:
+                        cellptr += a
+                        check_pointer()
+                check_pointer()
+
+            elif op == OUTPUT:
+                out.append(tape[cellptr + a])
+                if len(out) >= BLOCK_SIZE:
+                    stdout.write(out.decode('latin-1'))
+                    out.clear()
+
+            elif op == INPUT:
+                # prompts must be visible before waiting for input
+                stdout.write(out.decode('latin-1'))
+                stdout.flush()
+                out.clear()
+                char = read()
+                if char is not None:
+                    tape[cellptr + a] = char
+
+            codeptr += 1
+
+    finally:
+        stdout.write(out.decode('latin-1'))
+        stdout.flush()
+
+
+def _reach(ir: List[Op]) -> Tuple[int, int]:
+    """Return how far left and right of the pointer the IR accesses cells."""
+    offsets = [0]
+    for op, a, b in ir:
+        if op in (ADD, CLEAR, OUTPUT, INPUT):
+            offsets.append(a)
+        elif op == MULTIPLY:
+            offsets.append(b)
+            offsets.extend(offset for offset, _ in a)
+    return max(0, -min(offsets)), max(offsets)
+
+
+def _reader(stdin: Optional[BinaryIO]) -> Callable[[], Optional[int]]:
+    """Return a function reading the next byte, or None at the end of the input."""
+    if stdin is None:
+        def read_key() -> Optional[int]:
+            key = getch.getch()
+            if not key:
+                return None
+            return key[0] if isinstance(key, bytes) else ord(key) & 255
+
+        return read_key
+
+    # take whatever is available, so interactive streams do not block on a full block
+    read_block = getattr(stdin, 'read1', stdin.read)
+    buffer, position = b'', 0
+
+    def read_byte() -> Optional[int]:
+        nonlocal buffer, position
+        if position == len(buffer):
+            buffer, position = read_block(BLOCK_SIZE), 0
+            if not buffer:
+                return None
+        position += 1
+        return buffer[position - 1]
+
+    return read_byte
 
 
 def cleanup(code: str) -> str:
@@ -64,6 +197,100 @@ def build_bracemap(code: str) -> Dict[int, int]:
     return bracemap
 
 
+def compile_ir(code: str) -> List[Op]:
+    """Lower brainfuck code to IR.
+    Runs of +- and <> are folded, pointer moves are deferred into offsets
+    until the next loop, and clear, multiply/copy and scan loops are recognised.
+    """
+    code = cleanup(code)
+    bracemap = build_bracemap(code)
+    ir: List[Op] = []
+    jumps: List[int] = []
+    offset = 0
+
+    def add(value: int) -> None:
+        if ir and ir[-1][0] == ADD and ir[-1][1] == offset:
+            value += ir.pop()[2]
+        if value:
+            ir.append((ADD, offset, value))
+
+    def flush() -> None:
+        nonlocal offset
+        if offset:
+            ir.append((MOVE, offset, 0))
+            offset = 0
+
+    codeptr = 0
+    while codeptr < len(code):
+        char = code[codeptr]
+
+        if char in '+-':
+            add(1 if char == '+' else -1)
+
+        elif char in '><':
+            offset += 1 if char == '>' else -1
+
+        elif char == '.':
+            ir.append((OUTPUT, offset, 0))
+
+        elif char == ',':
+            ir.append((INPUT, offset, 0))
+
+        elif char == '[':
+            end = bracemap[codeptr]
+            loop = _simple_loop(code[codeptr + 1:end], offset)
+
+            if loop is None:
+                flush()
+                jumps.append(len(ir))
+                ir.append((JUMP_ZERO, 0, -1))
+
+            else:
+                if loop[0] == SCAN:
+                    flush()
+                elif loop[0] == CLEAR and ir and ir[-1][:2] == (ADD, offset):
+                    # the cell is cleared right after
+                    ir.pop()
+                ir.append(loop)
+                codeptr = end
+
+        elif char == ']':
+            flush()
+            start = jumps.pop()
+            ir.append((JUMP_NONZERO, 0, start))
+            ir[start] = (JUMP_ZERO, 0, len(ir) - 1)
+
+        codeptr += 1
+
+    flush()
+    return ir
+
+
+def _simple_loop(body: str, start: int) -> Op:
+    """Return the op a loop body starting at offset start can be replaced with, if any."""
+    if body in ('-', '+'):
+        return CLEAR, start, 0
+
+    if body and set(body) in ({'>'}, {'<'}):
+        return SCAN, len(body) if body[0] == '>' else -len(body), 0
+
+    if not body or not set(body) <= set('+-<>'):
+        return None
+
+    deltas, offset = defaultdict(int), start
+    for char in body:
+        if char in '><':
+            offset += 1 if char == '>' else -1
+        else:
+            deltas[offset] += 1 if char == '+' else -1
+
+    # the loop must decrement the cell it starts on by one and return to it
+    if offset != start or deltas.pop(start, 0) != -1:
+        return None
+
+    return MULTIPLY, tuple((o, f) for o, f in deltas.items() if f), start
+
+
 def launch_repl() -> None:
     while True:
         try:
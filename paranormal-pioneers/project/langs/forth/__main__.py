@@ -1,3 +1,9 @@
+import sys
+
 from project.langs.forth.forthimpl import launch_repl
 
-launch_repl()
+if sys.argv[1:2] == ['bench']:
+    from project.langs.forth.bench import main
+    main(sys.argv[2:])
+else:
+    launch_repl()
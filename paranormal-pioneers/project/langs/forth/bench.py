@@ -0,0 +1,183 @@
+from argparse import ArgumentParser
+from collections import defaultdict
+from contextlib import redirect_stdout
+from io import StringIO
+from time import perf_counter
+from timeit import timeit
+from typing import Callable, Dict, List, Optional, Tuple
+
+from project.langs.forth.forthimpl import DEFAULT_ENTRIES, ForthEnv, create_forth
+
+# name: (definitions, code timed)
+CORPUS: Dict[str, Tuple[str, str]] = {
+    'sieve': (
+        """CREATE FLAGS 8190 ALLOT
+        : SIEVE 0 8190 0 DO 1 FLAGS I + C! LOOP
+            8190 2 DO FLAGS I + C@ IF
+                1+ I I + BEGIN DUP 8190 < WHILE 0 OVER FLAGS + C! I + REPEAT DROP
+            THEN LOOP ;""",
+        'SIEVE .',
+    ),
+    'fib': (
+        ': FIB DUP 2 < 0= IF DUP 1- FIB SWAP 2 - FIB + THEN ;',
+        '20 FIB .',
+    ),
+    'nested loops': (
+        ': NESTED 0 200 0 DO 200 0 DO I J * + LOOP LOOP ;',
+        'NESTED .',
+    ),
+    'string output': (
+        ': GREET 5000 0 DO ." Hello, World!" I 5 .R SPACE S" bye" TYPE CR LOOP ;',
+        'GREET',
+    ),
+}
+
+# data stack every primitive is timed with
+PRIMITIVE_ARGS: Dict[str, Tuple] = {
+    '+': (7, 3),
+    '-': (7, 3),
+    '*': (7, 3),
+    '/': (7, 3),
+    'MOD': (7, 3),
+    '>': (7, 3),
+    '<': (7, 3),
+    '=': (7, 3),
+    '<>': (7, 3),
+    'AND': (7, 3),
+    'OR': (7, 3),
+    'INVERT': (7,),
+    'XOR': (7, 3),
+    'LSHIFT': (7, 3),
+    'RSHIFT': (7, 3),
+    'ABS': (-7,),
+    'MIN': (7, 3),
+    'MAX': (7, 3),
+    'DUP': (7,),
+    '2DUP': (7, 3),
+    'SWAP': (7, 3),
+    '2SWAP': (1, 2, 3, 4),
+    'ROT': (1, 2, 3),
+    '2ROT': (1, 2, 3, 4, 5, 6),
+    'OVER': (7, 3),
+    '2OVER': (1, 2, 3, 4),
+    'DROP': (7,),
+    '2DROP': (7, 3),
+}
+
+
+def _nop(env: ForthEnv) -> int:
+    return 0
+
+
+def time_primitive(name: str, number: int = 100_000) -> float:
+    """Return the time a primitive takes in nanoseconds,
+    without the time taken to refill the data stack.
+    """
+    env = ForthEnv(DEFAULT_ENTRIES)
+    args = PRIMITIVE_ARGS[name]
+
+    def run(word) -> float:
+        stmt = 'data[:] = args; word(env)'
+        namespace = dict(data=env.data, args=args, word=word, env=env)
+        return timeit(stmt, globals=namespace, number=number)
+
+    elapsed = run(env.forth_dict[name]) - run(_nop)
+    return max(elapsed, 0) / number * 1e9
+
+
+def print_primitive_timings(number: int = 100_000) -> None:
+    for name in PRIMITIVE_ARGS:
+        print(f'{name:<8}{time_primitive(name, number):>8.1f} ns/op')
+
+
+class Profiler:
+    """Count calls, cumulative time and the peak data stack depth
+    of the entries of an environment, by wrapping them in place.
+    Words defined afterwards are not profiled.
+    """
+    def __init__(self, env: ForthEnv) -> None:
+        self.env = env
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.times: Dict[str, float] = defaultdict(float)
+        self.peak_depth = len(env.data)
+        # recursion depth of every word, so recursive calls are timed once
+        self._active: Dict[str, int] = defaultdict(int)
+
+        for name, entry in env.forth_dict.items():
+            entry.code = self._wrap(name, entry.code)
+
+    @property
+    def words(self) -> int:
+        return sum(self.calls.values())
+
+    def _wrap(self, name: str, code: Callable[[ForthEnv], int]) -> Callable[[ForthEnv], int]:
+        def profiled(env: ForthEnv) -> int:
+            self.calls[name] += 1
+            self.peak_depth = max(self.peak_depth, len(env.data))
+            self._active[name] += 1
+            start = perf_counter()
+            try:
+                return code(env)
+            finally:
+                self._active[name] -= 1
+                if not self._active[name]:
+                    self.times[name] += perf_counter() - start
+                self.peak_depth = max(self.peak_depth, len(env.data))
+
+        return profiled
+
+    def report(self, limit: int = 15) -> List[str]:
+        names = sorted(self.times, key=self.times.get, reverse=True)[:limit]
+        return [
+            f'  {name:<12}{self.calls[name]:>10} calls{self.times[name] * 1e3:>12.2f} ms'
+            for name in names
+        ]
+
+
+def run_program(
+    definitions: str, code: str, profile: bool = False
+) -> Tuple[float, Optional[Profiler]]:
+    """Evaluate code in a fresh environment with the definitions,
+    return its wall time and the profiler if requested.
+    """
+    forth = create_forth()
+    with redirect_stdout(StringIO()):
+        forth.eval(definitions)
+        profiler = Profiler(forth) if profile else None
+        start = perf_counter()
+        forth.eval(code)
+        return perf_counter() - start, profiler
+
+
+def print_corpus_timings(profile: bool = False) -> None:
+    print(f'{"program":<16}{"wall time":>12}{"words/s":>14}{"peak stack":>12}')
+    for name, (definitions, code) in CORPUS.items():
+        elapsed, _ = run_program(definitions, code)
+        # counting words slows them down, so they are counted in another run
+        _, profiler = run_program(definitions, code, profile=True)
+        print(
+            f'{name:<16}{elapsed:>10.3f} s{profiler.words / elapsed:>14.0f}'
+            f'{profiler.peak_depth:>12}'
+        )
+        if profile:
+            print(*profiler.report(), sep='\n')
+
+
+def main(args: List[str]) -> None:
+    parser = ArgumentParser(prog='python -m project.langs.forth bench')
+    parser.add_argument(
+        '-p', '--profile', action='store_true', help='show calls and time of every word'
+    )
+    parser.add_argument(
+        '--primitives', action='store_true', help='time primitives instead of the corpus'
+    )
+    ns = parser.parse_args(args)
+
+    if ns.primitives:
+        print_primitive_timings()
+    else:
+        print_corpus_timings(profile=ns.profile)
+
+
+if __name__ == '__main__':
+    print_primitive_timings()
@@ -1,6 +1,10 @@
 import operator as op
-from re import sub
-from typing import List, Union, Callable, Dict, TypeVar, Any
+import os
+import pickle
+from hashlib import sha256
+from pathlib import Path
+from re import compile as re_compile
+from typing import List, Union, Callable, Dict, Iterator, Optional, Tuple, TypeVar, Any
 
 from project.langs.forth import wordimpl
 
@@ -43,18 +47,86 @@ def pops(arity: int, returns=-1) -> Callable:
                 env.data[-arity:] = []
             return 0
 
+        if (arity, returns) in FAST_POPS:
+            return FAST_POPS[arity, returns](fun, inner)
         return inner
 
     return decorator
 
 
+# pops for the most common signatures, changing the data stack in place;
+# on stack underflow they leave it to the generic pops, which reports the missing parameters
+
+def _pops_none(fun: Callable, generic: Callable) -> Callable:
+    def inner(env: ForthEnv) -> int:
+        fun()
+        return 0
+
+    return inner
+
+
+def _pops_one(fun: Callable, generic: Callable) -> Callable:
+    def inner(env: ForthEnv) -> int:
+        data = env.data
+        if not data:
+            return generic(env)
+        fun(data.pop())
+        return 0
+
+    return inner
+
+
+def _unary(fun: Callable, generic: Callable) -> Callable:
+    def inner(env: ForthEnv) -> int:
+        data = env.data
+        if not data:
+            return generic(env)
+        data[-1] = fun(data[-1])
+        return 0
+
+    return inner
+
+
+def _binary(fun: Callable, generic: Callable) -> Callable:
+    def inner(env: ForthEnv) -> int:
+        data = env.data
+        if len(data) < 2:
+            return generic(env)
+        b = data.pop()
+        data[-1] = fun(data[-1], b)
+        return 0
+
+    return inner
+
+
+FAST_POPS = {
+    (0, 0): _pops_none,
+    (1, 0): _pops_one,
+    (1, -1): _unary,
+    (2, -1): _binary,
+}
+
+
 class ForthEntry:
-    def __init__(self, code: Union[List[str], Callable[['ForthEnv'], int]], special=True):
+    def __init__(
+        self,
+        code: Callable[['ForthEnv'], int],
+        special=True,
+        words: Optional[List[Union[str, int]]] = None
+    ):
         self.code = code
         self.special = special
+        # body of a word defined with :
+        self.words = words
+
+    def __call__(self, env: 'ForthEnv') -> int:
+        return self.code(env)
+
+    def copy(self) -> 'ForthEntry':
+        return ForthEntry(self.code, self.special, self.words)
 
     def __repr__(self):
-        return f'Word: {self.code}'
+        return f'Word: {self.words if self.words is not None else self.code}'
 
 
 class ExecToken:
@@ -89,6 +161,50 @@ class Pointer:
         self.arr[self.idx] = val
 
 
+def literal(value: int) -> Callable[['ForthEnv'], int]:
+    def push(env: ForthEnv) -> int:
+        env.data.append(value)
+        return 0
+
+    return push
+
+
+class Definition:
+    """The body of a definition, bound once. ForthEnv.run enters it in a frame of its own,
+    so words calling each other do not nest Python calls.
+    """
+    def __init__(self, words: List[Union[str, int]], code: List[Callable]) -> None:
+        self.words = words
+        self.code = code
+
+    def __call__(self, env: 'ForthEnv') -> int:
+        # called from Python, like by EXECUTE
+        env.frames.append((env.words, env.code, env.index))
+        env.words, env.code = self.words, self.code
+        try:
+            env.run()
+        finally:
+            env.words, env.code, env.index = env.frames.pop()
+        return 0
+
+
+class LateBound:
+    """A word that was no entry when a body was bound, like the name of the definition
+    itself, looked up again whenever it runs.
+    """
+    def __init__(self, word: Union[str, int], forth_dict: Dict[str, ForthEntry]) -> None:
+        self.word = word
+        self.forth_dict = forth_dict
+
+    @property
+    def code(self) -> Optional[Callable[['ForthEnv'], int]]:
+        entry = self.forth_dict.get(self.word)
+        return None if entry is None else entry.code
+
+    def __call__(self, env: 'ForthEnv') -> int:
+        return env.interpret(self.word)
+
+
 class ForthEnv:
     def __init__(self, forth_dict: Dict[str, ForthEntry]) -> None:
         self.source = ''
@@ -98,45 +214,141 @@ class ForthEnv:
         self.astack: List = []
         # internal values, e.g. for loops
         self.rstack: List = []
+        # (words, code, index) of the callers of the word being executed
+        self.frames: List[Tuple[List, List, int]] = []
         # used by HERE, CREATE and ALLOT
         self.data_space = []
-        self.words: List[str] = []
+        self.words: List[Union[str, int]] = []
+        # what every word in words is bound to
+        self.code: List[Callable[[ForthEnv], int]] = []
         self.index = 0
-        self.forth_dict = forth_dict
+        # entries are updated in place when redefined, so they must not be shared
+        self.forth_dict = {name: entry.copy() for name, entry in forth_dict.items()}
         self.var_dict: Dict[str, Any] = {"BASE": 10}
         self.val_dict: Dict[str, Any] = {}
 
     def call_word(self, word: ForthEntry) -> int:
-        if word.special:
-            return word.code(self)
+        return word.code(self)
+
+    def interpret(self, word: str) -> int:
+        if word in self.forth_dict:
+            return self.call_word(self.forth_dict[word])
+        elif word in self.val_dict:
+            self.data.append(self.val_dict[word])
+        elif word in self.var_dict:
+            self.data.append(self.var_dict[word])
+        else:
+            try:
+                self.data.append(int(word))
+
+            except ValueError:
+                print('unknown name:', word)
+        return 0
+
+    def bind(self, word: Union[str, int]) -> Callable[['ForthEnv'], int]:
+        """Resolve a word to the entry or literal it stands for.
+        Values, variables and yet unknown names are looked up again when run.
+        """
+        if word in self.forth_dict:
+            return self.forth_dict[word]
+        if isinstance(word, str) and word not in self.val_dict and word not in self.var_dict:
+            try:
+                return literal(int(word))
+            except ValueError:
+                pass
+        return LateBound(word, self.forth_dict)
+
+    def compile_word(self, words: List[Union[str, int]]) -> Definition:
+        """Bind the body of a definition once."""
+        return Definition(words, [self.bind(word) for word in words])
+
+    def next_word(self) -> str:
+        """Consume the word following the one being executed.
+        When a definition ends right after the current word,
+        the word is taken from its caller instead, like in `: CREATE HERE 1+ VALUE ;`
+        """
+        level, words, code, index = len(self.frames), self.words, self.code, self.index
+        while level and index + 1 == len(words):
+            level -= 1
+            words, code, index = self.frames[level]
+
+        if level == len(self.frames):
+            self.index += 1
         else:
-            self.words[self.index:self.index + 1] = word.code
-            return -1
+            self.frames[level] = (words, code, index + 1)
+        return words[index + 1]
+
+    def run(self) -> None:
+        """Run self.code. A call to a definition pushes the caller on frames and goes on
+        with the body of the definition, so recursion is only limited by memory.
+        """
+        base = len(self.frames)
+        code, index = self.code, 0
+        try:
+            while True:
+                if index < len(code):
+                    self.index = index
+                    word = code[index]
+                    definition = getattr(word, 'code', None)
+                    if definition.__class__ is Definition:
+                        self.frames.append((self.words, code, index))
+                        self.words = definition.words
+                        self.code = code = definition.code
+                        index = 0
+                        continue
+
+                    d = word(self)
+                    # words like VALUE also move the index to skip their argument
+                    index = self.index + d + 1
+
+                elif len(self.frames) > base:
+                    # back to the caller, which next_word may have moved past an argument
+                    self.words, self.code, self.index = self.frames.pop()
+                    code, index = self.code, self.index + 1
+
+                else:
+                    return
+
+        except BaseException:
+            if len(self.frames) > base:
+                self.words, self.code, self.index = self.frames[base]
+                del self.frames[base:]
+            raise
 
     def eval(self, cmd) -> None:
         self.source = cmd
         self.words = forth_compile(cmd)  # some commands need the word list
-        self.index = 0
-        while self.index < len(self.words):
-            word = self.words[self.index]
-
-            if word in self.forth_dict:
-                d = self.call_word(self.forth_dict[word])
-                self.index += d
-            elif word in self.val_dict:
-                self.data.append(self.val_dict[word])
-            elif word in self.var_dict:
-                self.data.append(self.var_dict[word])
-
-            elif isinstance(word, str) and ' ' not in word:
-                try:
-                    self.data.append(int(word))
-
-                except ValueError:
-                    print('unknown name:', word)
-            elif not isinstance(word, str):
-                self.data.append(float(word))
-            self.index += 1
+        self.code = [self.bind(word) for word in self.words]
+        self.run()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the dictionary state of the environment, so it can be pickled."""
+        return dict(
+            source=self.source,
+            words={
+                name: entry.words for name, entry in self.forth_dict.items()
+                if not entry.special
+            },
+            var_dict=self.var_dict,
+            val_dict=self.val_dict,
+            data_space=self.data_space,
+        )
+
+    def restore(self, image: Dict[str, Any]) -> None:
+        """Load the dictionary state from a snapshot."""
+        self.source = image['source']
+        self.var_dict = image['var_dict']
+        self.val_dict = image['val_dict']
+        self.data_space = image['data_space']
+
+        # every word must exist before the bodies are bound
+        for name, words in image['words'].items():
+            entry = self.forth_dict.setdefault(name, ForthEntry(None))
+            entry.special, entry.words = False, words
+
+        for name in image['words']:
+            entry = self.forth_dict[name]
+            entry.code = self.compile_word(entry.words)
 
 
 DEFAULT_ENTRIES = {
@@ -151,7 +363,7 @@ DEFAULT_ENTRIES = {
     '<>': ForthEntry(pops(2)(op.ne)),
     'AND': ForthEntry(pops(2)(op.and_)),
     'OR': ForthEntry(pops(2)(op.or_)),
-    "INVERT": ForthEntry(pops(2)(op.inv)),
+    "INVERT": ForthEntry(pops(1)(op.inv)),
     "XOR": ForthEntry(pops(2)(op.xor)),
     "LSHIFT": ForthEntry(pops(2)(op.lshift)),
     "RSHIFT": ForthEntry(pops(2)(op.rshift)),
@@ -163,27 +375,26 @@ DEFAULT_ENTRIES = {
     'EMIT': ForthEntry(pops(1, returns=0)(lambda x: print(chr(x), end=''))),
     '?BRANCH': ForthEntry(wordimpl.jump_if_false),
     'BRANCH': ForthEntry(wordimpl.jump),
-    '-?BRANCH': ForthEntry(partial_kw(direction=-1)(wordimpl.jump_if_false)),
-    '-BRANCH': ForthEntry(partial_kw(direction=-1)(wordimpl.jump)),
     'DO': ForthEntry(wordimpl.forth_do),
     'LOOP': ForthEntry(wordimpl.forth_loop),
     '+LOOP': ForthEntry(wordimpl.forth_steploop),
+    'LEAVE': ForthEntry(wordimpl.forth_leave),
     'I': ForthEntry(wordimpl.forth_i),
     'J': ForthEntry(wordimpl.forth_j),
     '.R': ForthEntry(pops(2, returns=0)(lambda v, s: print(f'{v:>{s}}', end=''))),
     '."': ForthEntry(wordimpl.forth_puts),
     'S"': ForthEntry(wordimpl.forth_str_literal),
     '.S': ForthEntry(wordimpl.dots),
-    'DUP': ForthEntry(pops(1, returns=1)(lambda a: (a, a))),
-    '2DUP': ForthEntry(pops(2, returns=1)(lambda a, b: (a, b) * 2)),
-    'SWAP': ForthEntry(pops(2, returns=1)(lambda a, b: (b, a))),
-    '2SWAP': ForthEntry(pops(4, returns=1)(lambda a, b, c, d: (c, d, a, b))),
-    'ROT': ForthEntry((pops(3, returns=1)(lambda a, b, c: (b, c, a)))),
-    '2ROT': ForthEntry((pops(6, returns=1)(lambda a, b, *c: (*c, a, b)))),
-    'OVER': ForthEntry((pops(2, returns=1)(lambda a, b: (a, b, a)))),
-    '2OVER': ForthEntry((pops(4, returns=1)(lambda a, b, *c: (a, b, *c, a, b)))),
-    'DROP': ForthEntry((pops(1, returns=0)(lambda a: 0))),
-    '2DROP': ForthEntry((pops(2, returns=0)(lambda *a: 0))),
+    'DUP': ForthEntry(wordimpl.dup),
+    '2DUP': ForthEntry(wordimpl.two_dup),
+    'SWAP': ForthEntry(wordimpl.swap),
+    '2SWAP': ForthEntry(wordimpl.two_swap),
+    'ROT': ForthEntry(wordimpl.rot),
+    '2ROT': ForthEntry(wordimpl.two_rot),
+    'OVER': ForthEntry(wordimpl.over),
+    '2OVER': ForthEntry(wordimpl.two_over),
+    'DROP': ForthEntry(wordimpl.drop),
+    '2DROP': ForthEntry(wordimpl.two_drop),
     ".(": ForthEntry((partial_kw(char=')'))(wordimpl.forth_puts)),
     ':': ForthEntry(wordimpl.forth_def),
     ';': ForthEntry(lambda a: 0),
@@ -211,94 +422,169 @@ DEFAULT_ENTRIES = {
 
 T = TypeVar('T')
 
+# changes whenever images of older versions can no longer be loaded
+VERSION = 1
+DEFAULTS = Path(__file__).parent / 'defaults.forth'
+
+WORD = re_compile(r'\S+')
+# words taking the rest of the source up to a terminator as their argument
+LITERAL_TERMINATORS = {'.(': ')', '."': '"', 'S"': '"'}
 
-def forth_compile(words: str) -> List[str]:
-    """Generates a word list from the input string.
-    Also converts flow control into jumps.
+
+def forth_tokenize(source: str) -> Iterator[str]:
+    """Generates the upper cased words of the input string in a single pass.
+    Comments are skipped, and words from LITERAL_TERMINATORS are followed
+    by their literal argument as is.
     """
-    scope_stacks: Dict[str, List] = {k: [] for k in {'IF', 'DO', 'BEGIN'}}
-    labels = 0
-    out = []
-    rest = words
+    pos = 0
+    while True:
+        match = WORD.search(source, pos)
+        if match is None:
+            return
+        word = match.group().upper()
+
+        if word in LITERAL_TERMINATORS:
+            # a single whitespace separates the word from its literal
+            start = match.end() + 1
+            end = source.find(LITERAL_TERMINATORS[word], start)
+            end = len(source) if end == -1 else end
+            yield word
+            yield source[start:end]
+            pos = end + 1
+
+        elif word in ('(', '\\'):
+            end = source.find(')' if word == '(' else '\n', match.end())
+            pos = len(source) if end == -1 else end + 1
+
+        else:
+            yield word
+            pos = match.end()
 
-    while rest:
-        rest = str(sub(r'\s', ' ', rest, 1))
-        word, _, rest = rest.partition(' ')
-        word = word.upper()
 
+def forth_compile(words: str) -> List[Union[str, int]]:
+    """Generates an instruction list from the input string.
+    Flow control is converted into branch words,
+    each followed by the absolute index it jumps to.
+    """
+    # (opening word, index of its target or of its first word)
+    control: List[Tuple[str, int]] = []
+    # pending LEAVE targets for every open DO
+    leave_stacks: List[List[int]] = []
+    out: List[Union[str, int]] = []
+
+    def forward(branch: str) -> int:
+        """Append a branch whose target is not known yet, return the index of its target."""
+        out.extend((branch, -1))
+        return len(out) - 1
+
+    def resolve(target_index: int) -> None:
+        out[target_index] = len(out)
+
+    def close(word: str, *openers: str) -> int:
+        assert control and control[-1][0] in openers, f'compilation failed: unexpected {word}'
+        return control.pop()[1]
+
+    tokens = forth_tokenize(words)
+    for word in tokens:
         if word == 'IF':
-            scope_stacks[word].append(labels)
-            out.extend((str(labels), '?BRANCH'))
-            labels += 1
+            control.append((word, forward('?BRANCH')))
 
         elif word == 'ELSE':
-            label = scope_stacks['IF'].pop()
-            scope_stacks['IF'].append(labels)
-            out.extend((str(labels), 'BRANCH', f' {label}'))
-            labels += 1
+            target_index = close(word, 'IF')
+            control.append(('IF', forward('BRANCH')))
+            resolve(target_index)
 
         elif word == 'THEN':
-            label = scope_stacks['IF'].pop()
-            out.append(f' {label}')
+            resolve(close(word, 'IF'))
 
         elif word == 'DO':
-            scope_stacks[word].append(labels)
-            out.extend((word, f' {labels}'))
-            labels += 1
+            out.append(word)
+            control.append((word, len(out)))
+            leave_stacks.append([])
 
         elif word == 'BEGIN':
-            scope_stacks[word].append(labels)
-            out.append(f' {labels}')
-            labels += 1
+            control.append((word, len(out)))
 
         elif word in ('LOOP', '+LOOP'):
-            label = scope_stacks['DO'].pop()
-            out.extend((str(label), word))
+            out.extend((word, close(word, 'DO')))
+            for target_index in leave_stacks.pop():
+                resolve(target_index)
 
         elif word == 'UNTIL':
-            label = scope_stacks['BEGIN'].pop()
-            out.extend((str(label), '-?BRANCH'))
+            out.extend(('?BRANCH', close(word, 'BEGIN')))
 
         elif word == 'AGAIN':
-            label = scope_stacks['BEGIN'].pop()
-            out.extend((str(label), '-BRANCH'))
+            out.extend(('BRANCH', close(word, 'BEGIN')))
 
         elif word == 'LEAVE':
-            label = scope_stacks['DO'][-1]
-            out.extend((str(label), 'BRANCH'))
+            assert leave_stacks, 'compilation failed: LEAVE outside of a loop'
+            leave_stacks[-1].append(forward(word))
 
         elif word == 'WHILE':
-            scope_stacks['BEGIN'].append(labels)
-            out.extend((str(labels), '?BRANCH'))
-            labels += 1
+            assert control and control[-1][0] == 'BEGIN', 'compilation failed: unexpected WHILE'
+            control.append((word, forward('?BRANCH')))
+
         elif word == 'REPEAT':
-            self_label = scope_stacks['BEGIN'].pop()
-            jump_label = scope_stacks['BEGIN'].pop()
-            out.extend((str(jump_label), '-BRANCH', f' {self_label}'))
+            target_index = close(word, 'WHILE')
+            out.extend(('BRANCH', close(word, 'BEGIN')))
+            resolve(target_index)
 
-        elif word in {'.(', '."', 'S"'}:
-            literal, term, rest = rest.partition(')' if word.endswith('(') else '"')
-            out.extend((word, literal, term))
+        elif word == ':':
+            # the end of the definition, so : can skip its body
+            control.append((word, forward(word)))
 
-        elif word == '(':
-            _, _, rest = rest.partition(')')
+        elif word == ';':
+            resolve(close(word, ':'))
 
-        elif word == '\\':
-            _, _, rest = rest.partition('\n')
+        elif word in LITERAL_TERMINATORS:
+            out.extend((word, next(tokens)))
 
-        elif word:
+        else:
             out.append(word)
 
-    assert all(not o for o in scope_stacks.values()), 'compilation failed'
+    assert not control, 'compilation failed'
 
     return out
 
 
-def create_forth() -> ForthEnv:
-    forth = ForthEnv(DEFAULT_ENTRIES)
+def _image_path(source: bytes) -> Path:
+    digest = sha256(source).hexdigest()[:16]
+    return Path(__file__).parent / '__pycache__' / f'defaults.v{VERSION}.{digest}.image'
 
-    with open(f'{__file__}/../defaults.forth') as f:
-        forth.eval(f.read())
+
+def create_forth() -> ForthEnv:
+    """Create an environment with the words from defaults.forth.
+    The resulting state is cached in an image next to the bytecode of this module,
+    so it is only evaluated again when the file or the interpreter changes.
+    """
+    source = DEFAULTS.read_bytes()
+    image = _image_path(source)
+
+    try:
+        forth = ForthEnv(DEFAULT_ENTRIES)
+        with open(image, 'rb') as f:
+            forth.restore(pickle.load(f))
+        return forth
+
+    except Exception:
+        # missing, outdated or broken image
+        forth = ForthEnv(DEFAULT_ENTRIES)
+        forth.eval(source.decode('utf-8'))
+
+    try:
+        image.parent.mkdir(exist_ok=True)
+        temp = image.with_suffix(f'.{os.getpid()}.tmp')
+        with open(temp, 'wb') as f:
+            pickle.dump(forth.snapshot(), f)
+        os.replace(temp, image)
+
+        # images of other versions of the file or the interpreter are never read again
+        for stale in image.parent.glob('defaults.v*.image'):
+            if stale != image:
+                stale.unlink()
+
+    except OSError:
+        pass
 
     return forth
 
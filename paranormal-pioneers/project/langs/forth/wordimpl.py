@@ -1,31 +1,14 @@
-import itertools as it
 import sys
-from functools import reduce, partial
-from typing import Iterable, TypeVar, Callable
+from typing import TypeVar
 
 T = TypeVar('T')
 ForthEnv = 'project.langs.forth.forthimpl.ForthEnv'
 
 
-# BRANCH, :
-def _step_to(
-        to_search: Iterable[T],
-        item: T,
-        predicate: Callable[[T, T], bool] = lambda i, x: x != i
-) -> int:
-    return reduce(
-        lambda a, _: a + 1,
-        it.takewhile(
-            partial(predicate, item),
-            to_search
-        ), 0
-    )
-
-
 # BRANCH, LOOP
-def _jump(env: ForthEnv, label, direction=1) -> int:
-    to_search = env.words[env.index::direction]
-    return _step_to(to_search, f' {label}') * direction
+def _branch(env: ForthEnv) -> int:
+    target = env.words[env.index + 1]
+    return target - env.index - 1
 
 
 def _str_literal(env: ForthEnv, literal: str):
@@ -35,18 +18,16 @@ def _str_literal(env: ForthEnv, literal: str):
 
 
 # BRANCH
-def jump_if_false(env: ForthEnv, direction=1) -> int:
-    label = env.data.pop()
+def jump_if_false(env: ForthEnv) -> int:
     cond = env.data.pop()
     if cond:
-        return 0
-    return _jump(env, label, direction=direction)
+        return 1
+    return _branch(env)
 
 
 # BRANCH
-def jump(env: ForthEnv, direction=1) -> int:
-    label = env.data.pop()
-    return _jump(env, label, direction=direction)
+def jump(env: ForthEnv) -> int:
+    return _branch(env)
 
 
 # DO
@@ -60,19 +41,17 @@ def forth_do(env: ForthEnv) -> int:
 
 # LOOP
 def forth_loop(env: ForthEnv) -> int:
-    label = env.data.pop()
     env.rstack[-1] += 1
     *_, end, start = env.rstack
     if start < end:
-        return _jump(env, label, -1)
+        return _branch(env)
     env.rstack.pop()
     env.rstack.pop()
-    return 0
+    return 1
 
 
 # +LOOP
 def forth_steploop(env: ForthEnv) -> int:
-    label = env.data.pop()
     step = env.data.pop()
     env.rstack[-1] += step
     *_, end, idx = env.rstack
@@ -80,8 +59,15 @@ def forth_steploop(env: ForthEnv) -> int:
     if oidx < end <= idx or oidx >= end > idx:
         env.rstack.pop()
         env.rstack.pop()
-        return 0
-    return _jump(env, label, -1)
+        return 1
+    return _branch(env)
+
+
+# LEAVE
+def forth_leave(env: ForthEnv) -> int:
+    env.rstack.pop()
+    env.rstack.pop()
+    return _branch(env)
 
 
 # I
@@ -96,17 +82,102 @@ def forth_j(env: ForthEnv) -> int:
     return 0
 
 
+def _check_depth(env: ForthEnv, depth: int) -> None:
+    """Fail like the words made with pops when the stack is too shallow,
+    before the stack is changed.
+    """
+    if len(env.data) < depth:
+        print(env.words[env.index], 'missing parameters data=', env.data)  # DEBUG
+        raise TypeError(f'{env.words[env.index]} takes {depth} parameters')
+
+
+# DUP
+def dup(env: ForthEnv) -> int:
+    _check_depth(env, 1)
+    env.data.append(env.data[-1])
+    return 0
+
+
+# 2DUP
+def two_dup(env: ForthEnv) -> int:
+    _check_depth(env, 2)
+    env.data.extend(env.data[-2:])
+    return 0
+
+
+# SWAP
+def swap(env: ForthEnv) -> int:
+    _check_depth(env, 2)
+    data = env.data
+    data[-2], data[-1] = data[-1], data[-2]
+    return 0
+
+
+# 2SWAP
+def two_swap(env: ForthEnv) -> int:
+    _check_depth(env, 4)
+    data = env.data
+    data[-4], data[-3], data[-2], data[-1] = data[-2], data[-1], data[-4], data[-3]
+    return 0
+
+
+# ROT
+def rot(env: ForthEnv) -> int:
+    _check_depth(env, 3)
+    env.data.append(env.data.pop(-3))
+    return 0
+
+
+# 2ROT
+def two_rot(env: ForthEnv) -> int:
+    _check_depth(env, 6)
+    data = env.data
+    data.append(data.pop(-6))
+    data.append(data.pop(-6))
+    return 0
+
+
+# OVER
+def over(env: ForthEnv) -> int:
+    _check_depth(env, 2)
+    env.data.append(env.data[-2])
+    return 0
+
+
+# 2OVER
+def two_over(env: ForthEnv) -> int:
+    _check_depth(env, 4)
+    env.data.extend(env.data[-4:-2])
+    return 0
+
+
+# DROP
+def drop(env: ForthEnv) -> int:
+    _check_depth(env, 1)
+    env.data.pop()
+    return 0
+
+
+# 2DROP
+def two_drop(env: ForthEnv) -> int:
+    _check_depth(env, 2)
+    data = env.data
+    data.pop()
+    data.pop()
+    return 0
+
+
 # .", .(
 def forth_puts(env: ForthEnv, char='"') -> int:
     print(env.words[env.index + 1], end='')
-    return 2
+    return 1
 
 
 # s"
 def forth_str_literal(env: ForthEnv) -> int:
     literal = env.words[env.index + 1]
     _str_literal(env, literal)
-    return 2
+    return 1
 
 
 # C!
@@ -127,30 +198,38 @@ def ptr_get(env: ForthEnv) -> int:
 # :
 def forth_def(env: ForthEnv) -> int:
     from .forthimpl import ForthEntry
-    idx = _step_to(env.words[env.index:], ';')
-    words_ = {env.words[env.index + 1]: ForthEntry(
-        env.words[env.index + 2: env.index + idx],
-        special=False
-    )}
-    #  print('defined', words_)  # DEBUG
-    env.forth_dict.update(words_)
-    return idx
+    end = env.words[env.index + 1]
+    name = env.words[env.index + 2]
+    start = env.index + 3
+    # branch targets are relative to the body from now on
+    body = [
+        word - start if isinstance(word, int) else word
+        for word in env.words[start:end]
+    ]
+    code = env.compile_word(body)
+    entry = env.forth_dict.get(name)
+    if entry is None:
+        env.forth_dict[name] = ForthEntry(code, special=False, words=body)
+    else:
+        # words already bound to the entry pick up the new definition
+        entry.code, entry.special, entry.words = code, False, body
+    return end - env.index - 1
 
 
 # VARIABLE
 def forth_var(env: ForthEnv) -> int:
-    name = env.words[env.index + 1]
+    name = env.next_word()
     from project.langs.forth.forthimpl import Pointer
     env.var_dict.update({name: Pointer(0, [0])})
-    return 1
+    return 0
 
 
 # CONSTANT
 def forth_const(env: ForthEnv) -> int:
     val = env.data.pop()
-    name = env.words[env.index + 1]
+    name = env.next_word()
     env.var_dict.update({name: val})
-    return 1
+    return 0
 
 
 # !
@@ -203,24 +282,23 @@ def cp_r(env: ForthEnv) -> int:
 # '
 def quote(env: ForthEnv) -> int:
     from project.langs.forth.forthimpl import ExecToken
-    name = env.words[env.index + 1]
+    name = env.next_word()
     env.data.append(ExecToken(name))
-    return 1
+    return 0
 
 
 # EXECUTE
 def execute(env: ForthEnv) -> int:
     to_call = env.data.pop().name
-    env.words[env.index] = to_call
-    return -1
+    return env.interpret(to_call)
 
 
 # VALUE
 def value(env: ForthEnv) -> int:
-    name = env.words[env.index + 1].upper()
+    name = env.next_word().upper()
     val = env.data.pop()
     env.val_dict.update({name: val})
-    return 1
+    return 0
 
 
 # TO
@@ -250,9 +328,9 @@ def allot(env: ForthEnv) -> int:
 
 # 0X
 def hex_literal(env: ForthEnv) -> int:
-    literal = env.words[env.index + 1].upper()
+    literal = env.next_word().upper()
     env.data.append(int(literal, 16))
-    return 1
+    return 0
 
 
 # ACCEPT
@@ -0,0 +1,58 @@
+from collections import deque
+from itertools import chain, islice
+from typing import Deque, List
+
+
+class Scrollback:
+    """The last lines written to a console, and the line being written.
+    Older lines are dropped, so writing takes time proportional to the text written,
+    however long the session has run.
+    """
+    def __init__(self, limit: int = 1000) -> None:
+        self._lines: Deque[str] = deque(maxlen=max(limit, 1))
+        # pieces of the unfinished last line, joined once it is finished
+        self._partial: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._lines) + bool(self._partial)
+
+    @property
+    def limit(self) -> int:
+        return self._lines.maxlen
+
+    @property
+    def text(self) -> str:
+        return '\n'.join((*self._lines, str().join(self._partial)))
+
+    def view(self, rows: int, offset: int = 0) -> str:
+        """The text of the last rows lines, ending offset lines above the line being written.
+        Only the lines returned are visited, so a window on the scrollback is shown
+        in time proportional to its height.
+        """
+        lines = islice(
+            chain((str().join(self._partial),), reversed(self._lines)),
+            offset, offset + rows
+        )
+        return '\n'.join(reversed(list(lines)))
+
+    def max_offset(self, rows: int) -> int:
+        """The offset of a view of rows lines starting at the first line."""
+        return max(len(self._lines) + 1 - rows, 0)
+
+    def write(self, text: str) -> None:
+        *lines, last = text.split('\n')
+
+        if lines:
+            lines[0] = str().join(self._partial) + lines[0]
+            self._partial.clear()
+            self._lines.extend(lines)
+
+        if last:
+            self._partial.append(last)
+
+    def resize(self, limit: int) -> None:
+        self._lines = deque(self._lines, maxlen=max(limit, 1))
+
+    def clear(self) -> None:
+        self._lines.clear()
+        self._partial.clear()
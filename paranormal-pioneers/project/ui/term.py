@@ -1,4 +1,5 @@
-from typing import Any
+from threading import Event, Lock, Thread
+from typing import Any, Iterator, List, Optional
 
 from kivy.app import App
 from kivy.event import EventDispatcher
@@ -11,10 +12,14 @@ from kivy.uix.textinput import TextInput
 
 from project.core.path import Path
 from project.core.terminal import Terminal
+from project.ui.scrollback import Scrollback
 
 root = Path(__file__).parent.resolve()
 font = str(root / 'font.ttf')
 
+# chunks of output a command may produce before waiting for the ui to show them
+MAX_PENDING = 1024
+
 
 class Shell(EventDispatcher):
     __events__ = ('on_output', 'on_complete')
@@ -23,32 +28,101 @@ class Shell(EventDispatcher):
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
         self.term = Terminal()
+        self._worker: Optional[Thread] = None
+        # output of the worker not shown yet
+        self._pending: List[str] = []
+        self._lock = Lock()
+        self._drained = Event()
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None
 
     def run_command(self, command: str, show_output=True, *args) -> None:
+        # commands run off the ui thread, so slow ones do not freeze the window;
+        # started here, so a cancellation before the worker runs is not lost
+        chunks = self.term.stream_cmd(command)
+        self._worker = Thread(target=self._execute, args=(chunks,), daemon=True)
+        self._worker.start()
+
+    def cancel(self) -> None:
+        if self.running:
+            self.term.cancel()
+
+    def _execute(self, chunks: Iterator[str]) -> None:
+        error = str()
         try:
-            result = self.term.run_cmd(command)
+            for chunk in chunks:
+                self._queue_output(chunk)
         except Exception as exc:
-            result = str(exc)
+            error = str(exc)
+            self._queue_output(error)
+        finally:
+            Clock.schedule_once(partial(self._complete, error))
+
+    def _queue_output(self, chunk: str) -> None:
+        """Pass output of the worker to the ui thread, which takes all of it once a frame."""
+        with self._lock:
+            self._pending.append(chunk)
+            scheduled = len(self._pending) > 1
+            full = len(self._pending) >= MAX_PENDING
+            if full:
+                self._drained.clear()
+
+        if not scheduled:
+            Clock.schedule_once(self._flush_output)
+
+        if full:
+            # fast commands must not pile their output up in memory
+            self._drained.wait()
+
+    def _flush_output(self, *args) -> None:
+        with self._lock:
+            output = str().join(self._pending)
+            self._pending.clear()
+            self._drained.set()
 
-        if result is None:
-            result = str()
+        self.dispatch('on_output', output)
 
-        self.dispatch('on_output', result)
-        self.dispatch('on_complete', result)
+    def _complete(self, error: str, *args) -> None:
+        self._worker = None
+        self.dispatch('on_complete', error)
 
 
 class ConsoleInput(TextInput):
     shell = ObjectProperty(None)
+    scrollback_lines = NumericProperty(1000)
 
     def __init__(self, **kwargs) -> None:
+        self.scrollback = Scrollback(self.scrollback_lines)
         super().__init__(**kwargs)
         self._cursor_pos = 0
         self.prompt_pos = 0
+        # lines the view is scrolled back from the bottom of the scrollback
+        self.scroll_offset = 0
+        # the command line being typed, which is not part of the scrollback yet
+        self._typed = str()
+        self._at_prompt = False
+        # output is rendered at most once a frame
+        self._trigger_render = Clock.create_trigger(self.render)
+        self.bind(size=self._resize)
         # trick kivy, hehe ~ nekit
         self.keyboard_on_key_down(None, (13, 'enter'), None, list())
 
     def keyboard_on_key_down(self, window, keycode, text, modifiers) -> Any:
         code, key = keycode
+        if self.shell is not None and self.shell.running:
+            if code == 99 and modifiers == ['ctrl']:
+                self.shell.cancel()
+                self.scrollback.write('^C')
+                self._trigger_render()
+            # the output of the running command is still coming
+            return
+
+        if self.scroll_offset:
+            # typing goes back to the command line
+            self.scroll(-self.scroll_offset)
+
         if (
             code not in (276, 273) and self.cursor_index() < self.prompt_pos
         ) or (
@@ -62,12 +136,15 @@ class ConsoleInput(TextInput):
             text = self.text[self._cursor_pos:]
 
             if text.strip().startswith('clear'):
-                self.text = ''
-                self._cursor_pos = 0
+                self.scrollback.clear()
                 self.prompt()
                 return
 
-            elif text.strip():
+            # the command line is part of the scrollback from now on
+            self.scrollback.write(text + '\n')
+            self._at_prompt = False
+
+            if text.strip():
                 Clock.schedule_once(partial(self._run_cmd, text))
 
             else:
@@ -89,19 +166,65 @@ class ConsoleInput(TextInput):
             self.cursor = self.get_cursor_from_index(self._cursor_pos)
 
     def prompt(self, *args) -> None:
-        ps = self.shell.term.format_ps()
-        self._cursor_pos = self.cursor_index() + len(ps)
-        self.prompt_pos = self._cursor_pos
-        self.text += ps
+        self.scrollback.write(self.shell.term.format_ps())
+        self.scroll_offset = 0
+        self._typed = str()
+        self._at_prompt = True
+        self.render()
+
+    def visible_rows(self) -> int:
+        height = self.parent.height if self.parent is not None else self.height
+        height -= self.padding[1] + self.padding[3]
+        return max(int(height / (self.line_height + self.line_spacing)), 1)
+
+    def render(self, *args) -> None:
+        """Show the scrollback lines in view, so the text laid out is bounded
+        by the height of the window, not by the length of the scrollback.
+        """
+        self._trigger_render.cancel()
+        rows = self.visible_rows()
+        self.scroll_offset = min(self.scroll_offset, self.scrollback.max_offset(rows))
+        view = self.scrollback.view(rows, self.scroll_offset)
+
+        if self.scroll_offset:
+            self.text = view
+        else:
+            self.text = view + (self._typed if self._at_prompt else str())
+            self._cursor_pos = self.prompt_pos = len(view)
+        self.cursor = self.get_cursor_from_index(len(self.text))
+
+    def scroll(self, lines: int) -> None:
+        """Scroll the view lines back, or forward when lines is negative."""
+        self._save_typed()
+        self.scroll_offset = max(self.scroll_offset + lines, 0)
+        self.render()
+
+    def _save_typed(self) -> None:
+        if self._at_prompt and not self.scroll_offset:
+            self._typed = self.text[self.prompt_pos:]
+
+    def _resize(self, *args) -> None:
+        self._save_typed()
+        self._trigger_render()
+
+    def on_touch_down(self, touch) -> Any:
+        if self.collide_point(*touch.pos) and touch.is_mouse_scrolling:
+            if touch.button == 'scrolldown':
+                self.scroll(self.lines_to_scroll)
+            elif touch.button == 'scrollup':
+                self.scroll(-self.lines_to_scroll)
+            return True
+        return super().on_touch_down(touch)
+
+    def on_scrollback_lines(self, instance, value) -> None:
+        self.scrollback.resize(int(value))
 
     def on_output(self, output: str) -> None:
-        if not self.text.endswith('\n'):
-            self.text += '\n'
-        self.text += output
-
-        self.text += '\n'
+        self.scrollback.write(output)
+        self._trigger_render()
 
     def on_complete(self, result: str) -> None:
+        self.scrollback.write('\n')
         self.prompt()
 
 
@@ -114,6 +237,7 @@ class KivyConsole(BoxLayout, Shell):
 
     font_name = StringProperty(font)
     font_size = NumericProperty(16)
+    scrollback_lines = NumericProperty(1000)
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
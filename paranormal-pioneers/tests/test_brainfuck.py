@@ -0,0 +1,86 @@
+from io import BytesIO, StringIO
+
+import pytest
+
+from project.core.constants import FILE_SYSTEM
+from project.langs.brainfuck import codegen
+from project.langs.brainfuck.bench import CORPUS
+from project.langs.brainfuck.impl import (
+    ADD, CLEAR, JUMP_NONZERO, JUMP_ZERO, MOVE, MULTIPLY, OUTPUT, SCAN, brainfuck, compile_ir
+)
+
+HELLO_WORLD = (FILE_SYSTEM / 'examples' / 'brainfuck' / 'helloworld.bf').read_text()
+
+
+def test_compile_folds_runs():
+    assert compile_ir('+++-->><.<<') == [(ADD, 0, 1), (OUTPUT, 1, 0), (MOVE, -1, 0)]
+
+
+def test_compile_recognises_simple_loops():
+    assert compile_ir('>[-]') == [(CLEAR, 1, 0), (MOVE, 1, 0)]
+    assert compile_ir('[>]') == [(SCAN, 1, 0)]
+    assert compile_ir('[->+>++<<]') == [(MULTIPLY, ((1, 1), (2, 2)), 0)]
+
+
+def test_compile_resolves_loops():
+    assert compile_ir('+[>.<-]') == [
+        (ADD, 0, 1), (JUMP_ZERO, 0, 4), (OUTPUT, 1, 0), (ADD, 0, -1), (JUMP_NONZERO, 0, 1)
+    ]
+
+
+def test_hello_world(capsys):
+    brainfuck(HELLO_WORLD)
+    assert capsys.readouterr().out == 'Hello World!\n'
+
+
+def test_input_is_read_from_stream():
+    stdout = StringIO()
+    brainfuck(',[.[-],]', stdin=BytesIO(b'hello'), stdout=stdout)
+    assert stdout.getvalue() == 'hello'
+
+
+def test_cells_wrap_unless_disabled():
+    stdout = StringIO()
+    brainfuck('-.>[-]++++++++[<++++++++>-]<+.', stdout=stdout)
+    assert stdout.getvalue() == '\xff@'
+
+    with pytest.raises(ValueError):
+        brainfuck('-', wrap=False)
+
+
+def test_tape_grows():
+    stdout = StringIO()
+    brainfuck('>' * 40000 + '+++[>+<-]>.', stdout=stdout)
+    assert stdout.getvalue() == '\x03'
+
+
+@pytest.mark.parametrize('name', CORPUS)
+def test_codegen_matches_interpreter(name):
+    code, stdin = CORPUS[name]
+    expected, output = StringIO(), StringIO()
+    brainfuck(code, stdin=BytesIO(stdin), stdout=expected)
+    codegen.run(code, stdin=BytesIO(stdin), stdout=output)
+    assert output.getvalue() == expected.getvalue()
+
+
+def test_codegen_caches_programs():
+    codegen.CACHE.clear()
+    program = codegen.compile_code(HELLO_WORLD)
+    assert codegen.compile_code(HELLO_WORLD) is program
+    assert codegen.compile_code(HELLO_WORLD, wrap=False) is not program
+
+
+def test_codegen_errors():
+    with pytest.raises(ValueError, match='overflow'):
+        codegen.run('-', wrap=False)
+
+    with pytest.raises(ValueError, match='left'):
+        codegen.run('<+')
+
+
+def test_codegen_falls_back_on_deep_nesting():
+    code = '+' + '[' * 30 + '-' + ']' * 30 + '++++++++[>++++++++<-]>+.'
+    assert codegen.compile_code(code) is None
+    stdout = StringIO()
+    codegen.run(code, stdout=stdout)
+    assert stdout.getvalue() == 'A'
@@ -0,0 +1,114 @@
+import time
+
+import pytest
+
+from project.langs.forth.forthimpl import (
+    DEFAULT_ENTRIES, DEFAULTS, ForthEnv, _image_path, create_forth, forth_compile
+)
+
+
+@pytest.fixture
+def forth():
+    return create_forth()
+
+
+def test_compile_resolves_branch_targets():
+    assert forth_compile('1 IF 2 ELSE 3 THEN') == [
+        '1', '?BRANCH', 6, '2', 'BRANCH', 7, '3'
+    ]
+    assert forth_compile('BEGIN 1 UNTIL') == ['1', '?BRANCH', 0]
+    assert forth_compile('10 0 DO I LOOP') == ['10', '0', 'DO', 'I', 'LOOP', 3]
+
+
+def test_compile_skips_comments_and_keeps_literals():
+    assert forth_compile('( a comment ) ." Hello World!" \\ a comment\ncr') == [
+        '."', 'Hello World!', 'CR'
+    ]
+
+
+def test_compile_rejects_unbalanced_flow_control():
+    with pytest.raises(AssertionError):
+        forth_compile('1 IF 2')
+
+    with pytest.raises(AssertionError):
+        forth_compile('BEGIN 1 THEN')
+
+
+def test_compile_is_linear():
+    source = ': SQUARE DUP * ; ' + '1 IF 2 SQUARE ELSE 3 THEN DROP ' * 12500
+    assert len(source.split()) > 100_000
+
+    start = time.perf_counter()
+    forth_compile(source)
+    assert time.perf_counter() - start < 2
+
+
+def test_flow_control(forth, capsys):
+    forth.eval(': SGN DUP 0< IF DROP -1 ELSE 0> IF 1 ELSE 0 THEN THEN ; -3 SGN . 0 SGN . 9 SGN .')
+    forth.eval(': CD BEGIN DUP . 1- DUP 0= UNTIL DROP ; 3 CD')
+    forth.eval(': WH BEGIN DUP 0> WHILE DUP . 1- REPEAT DROP ; 2 WH')
+    forth.eval(': NEST 2 0 DO 3 0 DO I J + . LOOP LOOP ; NEST')
+    forth.eval(': FIRST 10 0 DO I DUP . 2 = IF LEAVE THEN LOOP ; FIRST')
+    assert capsys.readouterr().out == '-1 0 1 3 2 1 2 1 0 1 2 1 2 3 0 1 2 '
+
+
+def test_parsing_words_read_from_caller(forth, capsys):
+    forth.eval('CREATE BUFFER 2 ALLOT 65 BUFFER C! BUFFER C@ .')
+    assert capsys.readouterr().out == '65 '
+
+
+def test_redefinition_reaches_existing_words(forth, capsys):
+    forth.eval(': ONE 1 ; : SHOW ONE . ; SHOW : ONE 2 ; SHOW')
+    assert capsys.readouterr().out == '1 2 '
+
+
+def test_deep_recursion(forth):
+    forth.eval(': CD DUP 0 > IF 1 - CD THEN ; 100000 CD')
+    assert forth.data == [0]
+
+    forth.eval(': EVEN? DUP 0= IF DROP 1 ELSE 1- ODD? THEN ;')
+    forth.eval(': ODD? DUP 0= IF DROP 0 ELSE 1- EVEN? THEN ;')
+    forth.eval('20001 EVEN?')
+    assert forth.data == [0, 0]
+    assert forth.frames == []
+
+
+def test_stack_underflow_leaves_the_stack(forth, capsys):
+    for source, data in [('1 +', [1]), ('ABS', []), ('EMIT', []), ('DROP', []),
+                         ('1 2DUP', [1]), ('1 2 3 2OVER', [1, 2, 3]), ('1 2DROP', [1]),
+                         ('1 2 3 4 5 2ROT', [1, 2, 3, 4, 5])]:
+        forth.data.clear()
+        with pytest.raises(TypeError):
+            forth.eval(source)
+        assert forth.data == data
+    assert 'missing parameters' in capsys.readouterr().out
+
+
+def test_definitions_are_local_to_an_environment(forth, capsys):
+    forth.eval(': DUP 3 ;')
+    create_forth().eval('1 DUP . .')
+    assert capsys.readouterr().out == '1 1 '
+
+
+def test_defaults_image_matches_evaluation(capsys):
+    create_forth()  # makes sure the image exists
+    restored = create_forth()
+    evaluated = ForthEnv(DEFAULT_ENTRIES)
+    evaluated.eval(DEFAULTS.read_text('utf-8'))
+
+    assert restored.snapshot() == evaluated.snapshot()
+
+    restored.eval('7 3 2 */MOD . . 2 SPACES 4 5 NIP .')
+    assert capsys.readouterr().out == '10 1   5 '
+
+
+def test_writing_an_image_removes_stale_ones():
+    image = _image_path(DEFAULTS.read_bytes())
+    stale = image.with_name('defaults.v0.0000000000000000.image')
+    image.parent.mkdir(exist_ok=True)
+    stale.write_bytes(b'')
+    image.unlink(missing_ok=True)
+
+    create_forth()
+    assert image.exists()
+    assert not stale.exists()
@@ -0,0 +1,102 @@
+import errno
+import os
+from filecmp import dircmp
+from shutil import SameFileError
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from project.core import path as path_module
+from project.core.constants import FILE_SYSTEM
+from project.core.path import CopyCancelled, Path, Progress
+from project.core.terminal import Terminal
+
+
+def make_tree(root: Path) -> int:
+    """Create a small tree of files, return the number of bytes in it."""
+    size = 0
+    for directory in ('', 'a', 'a/b', 'c'):
+        (root / directory).mkdir(parents=True, exist_ok=True)
+        for number in range(3):
+            data = os.urandom(number * 100_000 + 1)
+            (root / directory / f'file{number}').write_bytes(data)
+            size += len(data)
+    return size
+
+
+def assert_same_tree(comparison: dircmp) -> None:
+    assert not comparison.left_only and not comparison.right_only
+    assert not comparison.diff_files and not comparison.funny_files
+    for subdirectory in comparison.subdirs.values():
+        assert_same_tree(subdirectory)
+
+
+def test_copy_tree(tmp_path):
+    size = make_tree(Path(tmp_path / 'src'))
+    (tmp_path / 'dest').mkdir()
+
+    progress = Path(tmp_path / 'src').copy(tmp_path / 'dest', workers=3)
+    assert_same_tree(dircmp(tmp_path / 'src', tmp_path / 'dest' / 'src', ignore=[]))
+    assert (progress.files, progress.bytes) == (12, size)
+
+    stat, copied = (tmp_path / 'src' / 'a').stat(), (tmp_path / 'dest' / 'src' / 'a').stat()
+    assert stat.st_mtime == copied.st_mtime
+
+
+def test_copy_file_falls_back_to_buffered_chunks(tmp_path, monkeypatch):
+    def unsupported(*args):
+        raise OSError(errno.EXDEV, 'cross-device link')
+
+    monkeypatch.setattr(path_module, '_copy_file_range', unsupported)
+    monkeypatch.setattr(path_module, '_sendfile', unsupported)
+    monkeypatch.setattr(path_module, 'CHUNK_SIZE', 1000)
+    (tmp_path / 'file').write_bytes(os.urandom(12345))
+
+    progress = Path(tmp_path / 'file').copy(tmp_path / 'copy')
+    assert (tmp_path / 'copy').read_bytes() == (tmp_path / 'file').read_bytes()
+    assert progress.bytes == 12345
+
+
+def test_copy_keeps_files_it_did_not_create(tmp_path):
+    (tmp_path / 'file').write_bytes(b'data')
+    with pytest.raises(SameFileError):
+        Path(tmp_path / 'file').copy(tmp_path)
+    assert (tmp_path / 'file').read_bytes() == b'data'
+
+    with pytest.raises(FileNotFoundError):
+        Path(tmp_path / 'missing').copy(tmp_path / 'file')
+    assert (tmp_path / 'file').read_bytes() == b'data'
+
+
+def test_copy_is_cancelled(tmp_path):
+    (tmp_path / 'file').write_bytes(b'data')
+
+    with pytest.raises(CopyCancelled):
+        Path(tmp_path / 'file').copy(tmp_path / 'copy', cancelled=lambda: True)
+    assert not (tmp_path / 'copy').exists()
+
+    make_tree(Path(tmp_path / 'src'))
+    with pytest.raises(CopyCancelled):
+        Path(tmp_path / 'src').copy(tmp_path / 'dest', cancelled=lambda: True)
+
+
+def test_progress_is_reported():
+    reports = []
+    progress = Progress(reports.append, interval=0)
+    progress.add(10)
+    progress.add(5, files=1)
+    assert reports == [progress, progress]
+    assert (progress.files, progress.bytes) == (1, 15)
+    assert str(progress).startswith('1 files, 0.0 MB in ')
+
+
+def test_cp_reports_progress():
+    term = Terminal()
+    with TemporaryDirectory(dir=FILE_SYSTEM) as directory:
+        root = Path(directory)
+        make_tree(root / 'src')
+        (root / 'dest').mkdir()
+        output = term.run_cmd(f'cp -p {root.name}/src {root.name}/dest')
+
+        assert output.startswith('copied 12 files, 1.2 MB in ')
+        assert_same_tree(dircmp(root / 'src', root / 'dest' / 'src', ignore=[]))
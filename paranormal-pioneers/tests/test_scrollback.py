@@ -0,0 +1,43 @@
+from project.ui.scrollback import Scrollback
+
+
+def test_lines_are_joined_across_writes():
+    scrollback = Scrollback()
+    scrollback.write('root@term:~$ ')
+    scrollback.write('echo hi\n')
+    scrollback.write('h')
+    scrollback.write('i\n')
+    assert scrollback.text == 'root@term:~$ echo hi\nhi\n'
+    assert len(scrollback) == 2
+
+
+def test_old_lines_are_dropped():
+    scrollback = Scrollback(limit=3)
+    for number in range(100_000):
+        scrollback.write(f'{number}\n')
+    scrollback.write('$ ')
+    assert scrollback.text == '99997\n99998\n99999\n$ '
+
+    scrollback.resize(1)
+    assert scrollback.text == '99999\n$ '
+    assert scrollback.limit == 1
+
+
+def test_clear():
+    scrollback = Scrollback()
+    scrollback.write('a\nb')
+    scrollback.clear()
+    assert scrollback.text == ''
+    assert len(scrollback) == 0
+
+
+def test_view():
+    scrollback = Scrollback()
+    for number in range(100_000):
+        scrollback.write(f'{number}\n')
+    scrollback.write('$ ')
+    assert scrollback.view(3) == '99998\n99999\n$ '
+    assert scrollback.view(2, offset=1) == '99998\n99999'
+    assert scrollback.view(2, offset=scrollback.max_offset(2)) == '99000\n99001'
+    assert scrollback.view(2000) == scrollback.text
+    assert scrollback.max_offset(2000) == 0
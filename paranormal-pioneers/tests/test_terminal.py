@@ -0,0 +1,132 @@
+from tempfile import TemporaryDirectory
+from threading import Timer
+from time import perf_counter
+
+import pytest
+
+from project.core.constants import FILE_SYSTEM
+from project.core.parser import split_pipeline
+from project.core.path import Path
+from project.core.terminal import Terminal
+from project.core.utils import OSException, iter_lines
+from project.file_system.bin import ls
+
+
+def test_run_cmd_joins_streamed_output():
+    term = Terminal()
+    assert list(term.stream_cmd('echo hello')) == ['hello']
+    assert term.run_cmd('echo hello') == 'hello'
+    assert term.run_cmd('cd .') is None
+
+
+def test_cat_streams_chunks():
+    term = Terminal()
+    text = (term.path / '.termrc').read_text('utf-8')
+    assert term.run_cmd('cat .termrc') == text
+
+
+def test_sleep_is_cancelled():
+    term = Terminal()
+    Timer(0.1, term.cancel).start()
+    start = perf_counter()
+    term.run_cmd('sleep 5')
+    assert perf_counter() - start < 1
+    assert term.cancelled
+
+    # cancellation does not leak into the next command
+    start = perf_counter()
+    term.run_cmd('sleep 0.05')
+    assert 0.05 <= perf_counter() - start < 1
+
+
+def test_cancel_before_the_first_chunk_is_kept():
+    term = Terminal()
+    chunks = term.stream_cmd('sleep 5')
+    term.cancel()
+    start = perf_counter()
+    list(chunks)
+    assert perf_counter() - start < 1
+
+
+def test_commands_are_set_up_on_first_use():
+    term = Terminal()
+    assert term.parser._commands == {}
+
+    term.run_cmd('echo hello')
+    assert list(term.parser._commands) == ['echo']
+
+    names = [command.name for command in term.parser.list_commands()]
+    assert names == sorted(names)
+    assert 'sleep' in names
+
+
+def test_parsed_arguments_are_not_shared():
+    command = Terminal().parser.get_command('echo')
+    first = command._parse(['hello'])
+    first.text.append('world')
+    assert command._parse(['hello']).text == ['hello']
+
+
+def test_iter_lines():
+    assert list(iter_lines(None)) == []
+    assert list(iter_lines('a\nb')) == ['a\n', 'b']
+    assert list(iter_lines(['a', 'b\nc\n', '\nd'])) == ['ab\n', 'c\n', '\n', 'd']
+
+
+@pytest.mark.parametrize('string', ['a |', '| a', 'a >', 'a > b c', 'a > b | c', 'a || b'])
+def test_invalid_pipelines(string):
+    with pytest.raises(OSException):
+        split_pipeline(string)
+
+
+def test_pipeline():
+    assert split_pipeline('ls -a|grep x>>out') == ([['ls', '-a'], ['grep', 'x']], ('>>', 'out'))
+
+    term = Terminal()
+    assert term.run_cmd('cat .termrc | grep -i NAME= | head -n 1') is None
+    assert term.run_cmd('cat .termrc | grep -i name | head -n 1') == "name = 'name'\n"
+
+
+def test_pipeline_is_lazy():
+    term = Terminal()
+    lines = term.parser.execute('cat .termrc | head -n 1', term)
+    # nothing after the first line is read
+    assert next(lines) == '# this is a normal python file\n'
+    assert list(lines) == []
+
+
+def test_redirection():
+    term = Terminal()
+    path = term.path / 'test_redirection.txt'
+    try:
+        assert term.run_cmd('echo hello > test_redirection.txt') is None
+        term.run_cmd('echo world>>test_redirection.txt')
+        assert path.read_text() == 'hello\nworld\n'
+        assert term.run_cmd('cat test_redirection.txt | grep w') == 'world\n'
+    finally:
+        path.unlink()
+
+
+def test_ls_columns_widen_block_by_block(monkeypatch):
+    monkeypatch.setattr(ls, 'BLOCK_SIZE', 2)
+    rows = [['a', 'b'], ['ccc', 'd'], ['e', 'f'], ['g', 'hh']]
+    assert list(ls.expand(rows)) == [
+        ['a  ', 'b'], ['ccc', 'd'], ['e  ', 'f '], ['g  ', 'hh']
+    ]
+
+
+def test_ls_options():
+    term = Terminal()
+    with TemporaryDirectory(dir=FILE_SYSTEM) as directory:
+        for name in ('b', 'a', '.hidden', 'c'):
+            (Path(directory) / name).touch()
+        (Path(directory) / 'dir').mkdir()
+        name = Path(directory).name
+
+        assert term.run_cmd(f'ls {name}') == '<file> a  \n<file> b  \n<file> c  \n<dir>  dir'
+        assert term.run_cmd(f'ls -a -n 2 {name}') == '<file> .hidden\n<file> a      '
+        assert sorted(term.run_cmd(f'ls -U {name}').split()[1::2]) == ['a', 'b', 'c', 'dir']
+        assert term.run_cmd(f'ls -U -n 1 {name}').count('\n') == 0
+        for options in ('-n -1', '-U -n -1'):
+            with pytest.raises(OSException):
+                term.run_cmd(f'ls {options} {name}')
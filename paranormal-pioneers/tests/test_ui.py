@@ -0,0 +1,55 @@
+from time import perf_counter
+
+import pytest
+
+pytest.importorskip('kivy')
+
+from kivy.clock import Clock  # noqa: E402
+
+from project.ui.term import Shell  # noqa: E402
+
+
+class RecordingShell(Shell):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.output, self.results = [], []
+
+    def on_output(self, output: str) -> None:
+        self.output.append(output)
+
+    def on_complete(self, result: str) -> None:
+        self.results.append(result)
+
+
+def tick_until(condition, timeout: float) -> None:
+    start = perf_counter()
+    while not condition() and perf_counter() - start < timeout:
+        Clock.tick()
+
+
+def test_ui_keeps_ticking_during_sleep():
+    shell = RecordingShell()
+    ticks = []
+    event = Clock.schedule_interval(ticks.append, 0)
+    try:
+        shell.run_command('sleep 5')
+        tick_until(lambda: False, 0.5)
+        assert shell.running
+        assert len(ticks) > 10
+
+        start = perf_counter()
+        shell.cancel()
+        tick_until(lambda: shell.results, 2)
+        assert shell.results == ['']
+        assert not shell.running
+        assert perf_counter() - start < 1
+    finally:
+        event.cancel()
+
+
+def test_output_is_dispatched_on_the_ui_thread():
+    shell = RecordingShell()
+    shell.run_command('echo hello')
+    tick_until(lambda: shell.results, 2)
+    assert shell.output == ['hello']
+    assert shell.results == ['']
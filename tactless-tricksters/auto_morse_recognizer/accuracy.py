@@ -0,0 +1,69 @@
+"""Decode accuracy of synthetic morse recordings at several signal to noise ratios,
+with the fixed threshold the recognizer used to have and with the adaptive one.
+
+usage: python -m auto_morse_recognizer.accuracy
+"""
+from difflib import SequenceMatcher
+
+import numpy as np
+
+from auto_morse_recognizer.decoding import (RATE, SMALLEST_TIME_UNIT, VoiceActivityDetector,
+                                            decode_samples)
+from third_party.py_morse_code.morse import Morse
+
+MESSAGES = ['sos', 'the quick brown fox jumps over the lazy dog', 'morse code jam 2020']
+# rms of the noise in samples
+NOISE_LEVELS = {'quiet room': 30, 'normal room': 300, 'noisy room': 3000}
+SNRS_DB = [20, 10, 5, 0, -5]
+FIXED_THRESHOLD = 15
+TONE_FREQUENCY = 700  # Hz
+LEAD_IN_SEC = 2  # noise recorded before the message starts
+
+# units of time taken by every part of a message
+UNITS = {'.': (True, 1), '-': (True, 3), 'symbol': (False, 1), ' ': (False, 3), '/': (False, 7)}
+
+
+def synthesize(morse, noise_rms, snr_db, rng):
+    """Return the samples of a recording of morse code with white noise."""
+    unit = int(SMALLEST_TIME_UNIT * RATE)
+    amplitude = noise_rms * np.sqrt(2 * 10 ** (snr_db / 10))
+
+    activity = [(False, int(LEAD_IN_SEC / SMALLEST_TIME_UNIT))]
+    for word in morse.split(' / '):
+        for letter in word.split():
+            for symbol in letter:
+                activity += [UNITS[symbol], UNITS['symbol']]
+            activity[-1] = UNITS[' ']
+        activity[-1] = UNITS['/']
+
+    tone = np.concatenate([np.full(units * unit, active) for active, units in activity])
+    t = np.arange(len(tone)) / RATE
+    signal = tone * amplitude * np.sin(2 * np.pi * TONE_FREQUENCY * t)
+    return signal + rng.normal(0, noise_rms, len(signal))
+
+
+def decode(samples, active_threshold=None):
+    morse = decode_samples(samples, VoiceActivityDetector(active_threshold))
+    return ' '.join(morse.split()).strip(' /')
+
+
+def accuracy(expected, decoded):
+    return SequenceMatcher(None, expected, decoded).ratio()
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f'{"noise":<12}{"snr":>8}{"fixed":>10}{"adaptive":>10}')
+    for name, noise_rms in NOISE_LEVELS.items():
+        for snr_db in SNRS_DB:
+            fixed, adaptive = [], []
+            for message in MESSAGES:
+                expected = Morse(words=message).morse
+                samples = synthesize(expected, noise_rms, snr_db, rng)
+                fixed.append(accuracy(expected, decode(samples, FIXED_THRESHOLD)))
+                adaptive.append(accuracy(expected, decode(samples)))
+            print(f'{name:<12}{snr_db:>5} dB{np.mean(fixed):>10.0%}{np.mean(adaptive):>10.0%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,43 +1,77 @@
-from typing import List
-
 from kivy.utils import platform
 
+from auto_morse_recognizer.decoding import (ACTIVITY_HISTORY_BITS, CHUNK, RATE,
+                                            VoiceActivityDetector, decode_samples, read_wav)
+
 IS_MOBILE = platform in ['ios', 'android']
 
 if not IS_MOBILE:
     import numpy as np
-    from pyaudio import PyAudio, paInt16
-
-RATE = 16000
-CHUNK = 4000  # number of audio samples per frame of test_data
-DATA_RATE = 400  # sampling rate of signal activity in audio
-
-# morse parameters
-SMALLEST_TIME_UNIT = .08  # the unit of time in seconds that other duration will be multiple of
-DOT_DURATION_THRESHOLD_SEC = SMALLEST_TIME_UNIT
-DASH_DURATION_THRESHOLD_SEC = SMALLEST_TIME_UNIT * 3
-LETTER_END_DURATION_THRESHOLD_SEC = SMALLEST_TIME_UNIT * 3
-WORD_END_DURATION_THRESHOLD_SEC = SMALLEST_TIME_UNIT * 7
-
-NUM_BITS_PER_SEC = int(RATE / DATA_RATE)
-DOT_DURATION_THRESHOLD_BIT = int(DOT_DURATION_THRESHOLD_SEC * NUM_BITS_PER_SEC)
-DASH_DURATION_THRESHOLD_BIT = int(DASH_DURATION_THRESHOLD_SEC * NUM_BITS_PER_SEC)
-LETTER_END_DURATION_THRESHOLD_BIT = int(LETTER_END_DURATION_THRESHOLD_SEC * NUM_BITS_PER_SEC)
-WORD_END_DURATION_THRESHOLD_BIT = int(WORD_END_DURATION_THRESHOLD_SEC * NUM_BITS_PER_SEC)
+    from pyaudio import PyAudio, paContinue, paInputOverflow, paInt16
+
+RING_BUFFER_SEC = 10  # audio kept until it is decoded, the rest is dropped
+
+
+class RingBuffer:
+    """Audio samples written by the audio callback and read by the decoder,
+    in an array allocated once.
+    Only the writer moves written and only the reader moves read, so with one writer
+    and one reader neither waits for the other. The writer never overwrites samples
+    not read yet: when the buffer is full new samples are dropped and counted in overruns.
+    """
+    def __init__(self, size=RING_BUFFER_SEC * RATE):
+        self.data = np.zeros(size, dtype=np.int16)
+        self.written = 0  # samples written since the start
+        self.read = 0  # samples read since the start
+        self.overruns = 0  # samples dropped
+
+    def __len__(self):
+        return self.written - self.read
+
+    def write(self, samples):
+        free = len(self.data) - len(self)
+        if len(samples) > free:
+            self.overruns += len(samples) - free
+            samples = samples[:free]
+
+        start = self.written % len(self.data)
+        end = min(start + len(samples), len(self.data))
+        self.data[start:end] = samples[:end - start]
+        self.data[:len(samples) - (end - start)] = samples[end - start:]
+        self.written += len(samples)
+
+    def drain(self):
+        """Return all the samples written since the last drain."""
+        written = self.written
+        start, end = self.read % len(self.data), written % len(self.data)
+        if written - self.read == len(self.data) or end < start:
+            samples = np.concatenate((self.data[start:], self.data[:end]))
+        else:
+            samples = self.data[start:end].copy()
+        self.read = written
+        return samples
 
 
 class AutoMorseRecognizer:
-    def __init__(self, debug=False, debug_plot=False, active_threshold=15):
+    def __init__(self, debug=False, debug_plot=False, active_threshold=None, sensitivity=0.5,
+                 audio=None):
         self.debug = debug
         self.debug_plot = debug_plot
         self.active_threshold = active_threshold
-        self.old_buffer = None
         if not IS_MOBILE:
-            self.pa = PyAudio()
+            self.detector = VoiceActivityDetector(active_threshold, sensitivity)
+            # audio is PyAudio, unless a fake source of audio is given
+            self.pa = PyAudio() if audio is None else audio
             self.stream = None
+            self.buffer = RingBuffer()
+            self.input_overflows = 0  # times the audio device dropped samples
 
     def calibrate_active_threshold(self):
-        pass
+        """Forget the noise floor and signal level heard so far,
+        for the threshold to adapt to the audio from now on.
+        """
+        if not IS_MOBILE:
+            self.detector.tracker.reset()
 
     def start(self):
         if not IS_MOBILE:
@@ -47,7 +81,8 @@ class AutoMorseRecognizer:
                                            rate=RATE,
                                            input=True,
                                            input_device_index=-1,
-                                           frames_per_buffer=CHUNK)
+                                           frames_per_buffer=CHUNK,
+                                           stream_callback=self.on_audio)
             else:
                 self.stream.start_stream()
 
@@ -55,6 +90,18 @@ class AutoMorseRecognizer:
         if not IS_MOBILE:
             self.stream.stop_stream()
 
+    def on_audio(self, in_data, frame_count, time_info, status):
+        """Called by the audio thread with every chunk recorded, only fills the buffer."""
+        if status & paInputOverflow:
+            self.input_overflows += 1
+        self.buffer.write(np.frombuffer(in_data, dtype=np.int16))
+        return None, paContinue
+
+    @property
+    def overruns(self):
+        """Samples dropped because they were not decoded in time."""
+        return self.buffer.overruns
+
     def update(self):
         morse_code, speech_activity = [], [0] * self.bits_per_frame
         if not IS_MOBILE:
@@ -62,78 +109,35 @@ class AutoMorseRecognizer:
                 if self.stream is None or self.stream.is_stopped():
                     raise IOError('stream is not started yet (run start() before update())')
                 else:
-                    data = np.frombuffer(self.stream.read(CHUNK), dtype=np.int16).astype(float)
-                    morse_code, speech_activity = self.get_morse_from_audio(data)
+                    # whatever was recorded since the last update, without waiting for the audio
+                    data = self.buffer.drain()
+                    morse_code, speech_activity = self.get_morse_from_audio(data.astype(float))
             except Exception as e:
                 print(str(e))
                 morse_code, speech_activity = [], [0] * self.bits_per_frame
         return morse_code, speech_activity
 
-    # def get_morse_from_wav_file(self, audio_path):
-    #     fs, x = wavfile.read(audio_path)
-    #     x = x.astype(float)
-    #     self.old_buffer = np.array([])
-    #     for i in range(0, len(x)-CHUNK, CHUNK):
-    #         data = x[i:i+CHUNK]
-    #         morse_code, _ = self.get_morse_from_audio(data)
-    #         if morse_code:
-    #             print(''.join(morse_code), end='')
+    def get_morse_from_wav_file(self, audio_path):
+        self.detector.reset()
+        return decode_samples(read_wav(audio_path), self.detector)
 
     @property
     def bits_per_frame(self):
-        return int(CHUNK / DATA_RATE)
+        return ACTIVITY_HISTORY_BITS
 
     @property
     def frame_rate(self):
         return float(CHUNK/RATE)
 
     def get_morse_from_audio(self, data):
-        speech_activity_vec = np.concatenate((self.old_buffer, self.get_voice_activity(data)))
-        morse_code, self.old_buffer = self.activity_to_morse(speech_activity_vec)
-        return morse_code, speech_activity_vec
-
-    def get_voice_activity(self, data):
-        data_reshaped = data.reshape((-1, DATA_RATE))
-        intensity = np.log(np.mean(data_reshaped ** 2, axis=1))
-        speech_activity = (intensity > self.active_threshold).astype(int)
+        morse_code, speech_activity = self.detector.process(data)
         if self.debug:
-            print(f'max intensity: {max(intensity)}')
-            print(f'min intensity: {min(intensity)}')
-        return speech_activity
-
-    def activity_to_morse(self, active_vec):
-        morse: List[str] = []
-        # vector of indices where the signal went from 1/0 to 0/1
-        onoffset_indices = np.concatenate(([0], np.where(np.diff(active_vec) != 0)[0]+1))
-        # a vector of len of segment between on/offset
-        segment_durations = np.diff(onoffset_indices)
-        is_active_vec = active_vec[onoffset_indices]
-
-        # for each segment of consecutive test_data value
-        # if the segment exceeds the duration threshold set morse value
-        for seg_dur, is_active in zip(segment_durations, is_active_vec):
-            if is_active:
-                if seg_dur >= DASH_DURATION_THRESHOLD_BIT:
-                    morse.append('-')
-                else:
-                    morse.append('.')
-            else:
-                if seg_dur >= WORD_END_DURATION_THRESHOLD_BIT:
-                    morse.append(' / ')
-                elif seg_dur >= LETTER_END_DURATION_THRESHOLD_BIT:
-                    morse.append(' ')
-        # keep the last segment to be stitched to the next frame
-        old_buffer = active_vec[onoffset_indices[-1]:]
-        trunc_len = min(len(old_buffer), WORD_END_DURATION_THRESHOLD_BIT)
-        old_buffer = old_buffer[-trunc_len:]
-
-        if self.debug:
-            print('speech activity vec: ' + str(active_vec))
-            print('onoffset_indices: ' + str(onoffset_indices))
-            print('segment_durations: ' + str(segment_durations))
-            print('old buffer: ' + str(old_buffer))
-
-        return morse, old_buffer
+            print('speech activity vec: ' + str(speech_activity))
+            print(f'noise floor: {self.detector.tracker.noise}')
+            print(f'signal level: {self.detector.tracker.signal}')
+            print(f'threshold: {self.detector.threshold}')
+            print('morse code: ' + str(morse_code))
+        return morse_code, speech_activity
 
 
 if __name__ == "__main__":
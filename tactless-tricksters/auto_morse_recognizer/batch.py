@@ -0,0 +1,112 @@
+"""Decode wav recordings of morse code offline, on a pool of processes.
+The text and morse code of every recording is written next to it in a .txt file,
+and the time taken to decode every recording to a csv file.
+
+usage: python -m auto_morse_recognizer.batch [-j JOBS] [--stats STATS] PATH [PATH ...]
+"""
+import csv
+import os
+import wave
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from time import perf_counter
+
+from auto_morse_recognizer.decoding import RATE, VoiceActivityDetector, decode_samples, read_wav
+from third_party.py_morse_code.morse import Morse
+
+STATS_FIELDS = ['path', 'audio_sec', 'decode_sec', 'speed', 'symbols', 'error']
+
+
+def find_wav_files(paths):
+    """Yield the wav files given, and those in the directories given."""
+    for path in map(Path, paths):
+        if path.is_dir():
+            yield from sorted(path.rglob('*.wav'))
+        else:
+            yield path
+
+
+def morse_to_text(morse_code):
+    """Return the text of morse code, with a ? for every unknown letter."""
+    morse = Morse(words='')
+    words = []
+    for morse_word in morse_code.split('/'):
+        letters = []
+        for morse_letter in morse_word.split():
+            try:
+                morse.read(morse=morse_letter)
+                letters.append(morse.words)
+            except KeyError:
+                letters.append('?')
+        words.append(''.join(letters))
+    return ' '.join(word for word in words if word)
+
+
+def decode_file(path, active_threshold=None, sensitivity=0.5):
+    """Decode a recording into a .txt file next to it, and return its stats."""
+    stats = dict.fromkeys(STATS_FIELDS, '')
+    stats['path'] = str(path)
+    start = perf_counter()
+    try:
+        samples = read_wav(path)
+        morse_code = decode_samples(samples, VoiceActivityDetector(active_threshold, sensitivity))
+        morse_code = morse_code.strip(' /')
+        path.with_suffix('.txt').write_text(f'{morse_to_text(morse_code)}\n{morse_code}\n')
+    except (OSError, EOFError, wave.Error) as e:
+        stats['error'] = str(e) or type(e).__name__
+        return stats
+
+    decode_sec = perf_counter() - start
+    audio_sec = len(samples) / RATE
+    stats.update(audio_sec=f'{audio_sec:.2f}', decode_sec=f'{decode_sec:.3f}',
+                 speed=f'{audio_sec / decode_sec:.0f}', symbols=len(morse_code.split()))
+    return stats
+
+
+def decode_files(paths, jobs=None, active_threshold=None, sensitivity=0.5):
+    """Yield the stats of every recording as soon as it is decoded, in order."""
+    paths = list(paths)
+    jobs = jobs or os.cpu_count()
+    with ProcessPoolExecutor(jobs) as pool:
+        yield from pool.map(decode_file, paths, [active_threshold] * len(paths),
+                            [sensitivity] * len(paths), chunksize=max(len(paths) // (jobs * 4), 1))
+
+
+def main():
+    parser = ArgumentParser(prog='python -m auto_morse_recognizer.batch',
+                            description='Decode wav recordings of morse code.')
+    parser.add_argument('paths', nargs='+', metavar='PATH',
+                        help='wav files, or directories searched for wav files')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='processes decoding recordings, one per cpu by default')
+    parser.add_argument('--stats', default='decode_stats.csv',
+                        help='csv file the time taken to decode every recording is written to')
+    parser.add_argument('--threshold', type=float, default=None,
+                        help='fixed log power of a tone, adapts to every recording by default')
+    parser.add_argument('--sensitivity', type=float, default=0.5,
+                        help='sensitivity of the adaptive threshold, from 0 to 1')
+    args = parser.parse_args()
+
+    start = perf_counter()
+    audio_sec, decoded, failed = 0, 0, 0
+    with open(args.stats, 'w', newline='') as fp:
+        writer = csv.DictWriter(fp, STATS_FIELDS)
+        writer.writeheader()
+        for stats in decode_files(find_wav_files(args.paths), args.jobs,
+                                  args.threshold, args.sensitivity):
+            writer.writerow(stats)
+            if stats['error']:
+                failed += 1
+                print(f'{stats["path"]}: {stats["error"]}')
+            else:
+                decoded += 1
+                audio_sec += float(stats['audio_sec'])
+
+    elapsed = perf_counter() - start
+    print(f'decoded {decoded} recordings ({audio_sec:.0f} s of audio) in {elapsed:.1f} s, '
+          f'{audio_sec / elapsed:.0f}x real time, {failed} failed')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+"""Decoding of morse code from audio samples, with numpy only, for recordings to be decoded
+without kivy or an audio device.
+"""
+import wave
+
+import numpy as np
+
+RATE = 16000
+CHUNK = 1600  # number of audio samples read per update, any size is decoded the same
+DATA_RATE = 400  # number of audio samples per bit of signal activity
+ACTIVITY_HISTORY_BITS = 10  # bits of signal activity kept for the audio indicator
+
+# morse parameters
+SMALLEST_TIME_UNIT = .08  # the unit of time in seconds that other duration will be multiple of
+DOT_DURATION_THRESHOLD_SEC = SMALLEST_TIME_UNIT
+DASH_DURATION_THRESHOLD_SEC = SMALLEST_TIME_UNIT * 3
+LETTER_END_DURATION_THRESHOLD_SEC = SMALLEST_TIME_UNIT * 3
+WORD_END_DURATION_THRESHOLD_SEC = SMALLEST_TIME_UNIT * 7
+
+NUM_BITS_PER_SEC = int(RATE / DATA_RATE)
+DOT_DURATION_THRESHOLD_BIT = int(DOT_DURATION_THRESHOLD_SEC * NUM_BITS_PER_SEC)
+DASH_DURATION_THRESHOLD_BIT = int(DASH_DURATION_THRESHOLD_SEC * NUM_BITS_PER_SEC)
+LETTER_END_DURATION_THRESHOLD_BIT = int(LETTER_END_DURATION_THRESHOLD_SEC * NUM_BITS_PER_SEC)
+WORD_END_DURATION_THRESHOLD_BIT = int(WORD_END_DURATION_THRESHOLD_SEC * NUM_BITS_PER_SEC)
+
+# adaptive threshold parameters, levels are the log power of bits
+LEVEL_WINDOW_SEC = 5  # the noise floor and signal level are tracked over the last seconds
+LEVEL_WINDOW_BITS = int(LEVEL_WINDOW_SEC * NUM_BITS_PER_SEC)
+NOISE_PERCENTILE = 20  # nothing is sent most of the time
+SIGNAL_PERCENTILE = 95  # but tones are sent some of the time
+MIN_SIGNAL_TO_NOISE = .5  # lowest level of a tone above the noise floor, about 2 dB
+POWER_FLOOR = 1.  # power of digital silence, keeps its level finite
+
+# symbols a run of tone completes within a chunk: none, a dash or a dot
+TONE_SYMBOLS = ['', '-', '.']
+# symbols a run of silence completes: none, a letter gap, the rest of a word gap, or a word gap
+GAP_SYMBOLS = ['', ' ', '/ ', ' / ']
+
+
+class LevelTracker:
+    """Tracks the noise floor and the signal level of the last window of bits
+    as percentiles of their levels, and sets the threshold of activity between them.
+    A sensitivity of 0 puts the threshold at the power of the signal and 1 at the power
+    of the noise, 0.5 halfway, where a bit is active if a tone lasts half of it.
+    The threshold stays MIN_SIGNAL_TO_NOISE above the noise floor, so noise alone is not a signal.
+    """
+    def __init__(self, sensitivity=0.5, window=LEVEL_WINDOW_BITS):
+        self.sensitivity = sensitivity
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self.levels = np.zeros(0)
+        self.noise = self.signal = None
+
+    def update(self, levels):
+        """Return the threshold once the levels of new bits are heard."""
+        self.levels = np.concatenate((self.levels, levels))[-self.window:]
+        self.noise, self.signal = np.percentile(self.levels, [NOISE_PERCENTILE, SIGNAL_PERCENTILE])
+        noise, signal = np.exp(self.noise), np.exp(self.signal)
+        threshold = np.log(noise + (1 - self.sensitivity) * (signal - noise))
+        return max(threshold, self.noise + MIN_SIGNAL_TO_NOISE)
+
+
+class VoiceActivityDetector:
+    """Turns audio of any chunk size into morse symbols as soon as they are known:
+    a dash once a tone lasts long enough, a dot when a shorter tone ends,
+    and a letter or word gap once a silence lasts long enough.
+    The only state carried between chunks is the samples not filling a bit yet,
+    the activity and length of the current run of bits, and the levels of recent bits
+    the threshold adapts to, unless active_threshold fixes it.
+    """
+    def __init__(self, active_threshold=None, sensitivity=0.5, history=ACTIVITY_HISTORY_BITS):
+        self.active_threshold = active_threshold
+        self.threshold = active_threshold
+        self.tracker = LevelTracker(sensitivity)
+        self.history = history
+        self.reset()
+
+    def reset(self):
+        self.tracker.reset()
+        self.remainder = np.zeros(0)
+        self.active = False
+        # runs longer than the longest threshold make no difference
+        self.run_length = 0
+        self.activity = np.zeros(self.history, dtype=int)
+
+    def process(self, data):
+        """Return the morse symbols completed by the audio samples,
+        and the latest bits of signal activity.
+        """
+        samples = np.concatenate((self.remainder, data))
+        num_bits = len(samples) // DATA_RATE
+        self.remainder = samples[num_bits * DATA_RATE:]
+
+        if not num_bits:
+            return [], self.activity
+
+        power = np.mean(samples[:num_bits * DATA_RATE].reshape(num_bits, DATA_RATE) ** 2, axis=1)
+        levels = np.log(np.maximum(power, POWER_FLOOR))
+        if self.active_threshold is None:
+            self.threshold = self.tracker.update(levels)
+        activity = levels > self.threshold
+
+        self.activity = np.concatenate((self.activity, activity.astype(int)))[-self.history:]
+        return self.activity_to_morse(activity), self.activity
+
+    def activity_to_morse(self, activity):
+        # the first run continues the current one, every change of activity starts another
+        levels = np.concatenate(([self.active], activity))
+        starts = np.flatnonzero(levels[1:] != levels[:-1])
+        lengths = np.diff(np.concatenate(([0], starts, [len(activity)])))
+        active = levels[np.concatenate(([0], starts + 1))]
+
+        before = np.zeros(len(lengths), dtype=int)
+        before[0] = self.run_length
+        after = before + lengths
+        ended = np.arange(len(lengths)) < len(lengths) - 1
+
+        def crossed(threshold):
+            return (before < threshold) & (after >= threshold)
+
+        dash = crossed(DASH_DURATION_THRESHOLD_BIT)
+        dot = ended & (after < DASH_DURATION_THRESHOLD_BIT)
+        letter = crossed(LETTER_END_DURATION_THRESHOLD_BIT)
+        word = crossed(WORD_END_DURATION_THRESHOLD_BIT)
+        symbols = np.where(
+            active,
+            np.array(TONE_SYMBOLS)[dash + 2 * dot],
+            np.array(GAP_SYMBOLS)[letter + 2 * word],
+        )
+
+        self.active = bool(active[-1])
+        self.run_length = int(min(after[-1], WORD_END_DURATION_THRESHOLD_BIT))
+        return symbols[symbols != ''].tolist()
+
+
+def read_wav(path):
+    """Return the samples of a PCM wav file mixed down to one channel and resampled to RATE,
+    scaled like the 16 bit samples of the microphone.
+    """
+    with wave.open(str(path)) as wav:
+        rate, channels, width = wav.getframerate(), wav.getnchannels(), wav.getsampwidth()
+        data = wav.readframes(wav.getnframes())
+
+    if len(data) % (width * channels):
+        raise wave.Error('truncated wav file: the last frame is incomplete')
+    if width == 1:
+        samples = (np.frombuffer(data, dtype=np.uint8).astype(float) - 128) * 256
+    elif width in (2, 4):
+        samples = np.frombuffer(data, dtype=f'<i{width}') / 2 ** (8 * (width - 2))
+    else:
+        raise wave.Error(f'unsupported sample width: {width * 8} bits')
+
+    samples = samples.reshape(-1, channels).mean(axis=1)
+    if rate != RATE:
+        times = np.arange(int(len(samples) * RATE / rate)) * rate / RATE
+        samples = np.interp(times, np.arange(len(samples)), samples)
+    return samples
+
+
+def decode_samples(samples, detector):
+    """Return the morse code of recorded samples, fed to the detector a CHUNK at a time
+    like the samples of the microphone.
+    """
+    morse_code = []
+    for i in range(0, len(samples), CHUNK):
+        morse_code += detector.process(samples[i:i + CHUNK])[0]
+    return ''.join(morse_code)
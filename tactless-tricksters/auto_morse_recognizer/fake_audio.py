@@ -0,0 +1,73 @@
+"""A fake of PyAudio playing samples to the callback of an input stream, for the recognizer
+to run without an audio device:
+
+    amr = AutoMorseRecognizer(audio=FakeAudio(samples))
+"""
+import threading
+import time
+
+import numpy as np
+
+
+class FakeStream:
+    """Calls the callback with a chunk of samples on another thread, at the rate of the samples
+    times speed, or as fast as it can if speed is None, as long as the stream is started.
+    """
+    def __init__(self, samples, callback, rate, frames_per_buffer, speed=1., start=True):
+        self.samples = np.asarray(samples, dtype=np.int16)
+        self.callback = callback
+        self.rate = rate
+        self.frames_per_buffer = frames_per_buffer
+        self.speed = speed
+        self.position = 0
+        self.started = threading.Event()
+        self.closed = False
+        self.thread = threading.Thread(target=self.play, daemon=True)
+        if start:
+            self.started.set()
+        self.thread.start()
+
+    def play(self):
+        next_time = time.perf_counter()
+        while self.is_active():
+            self.started.wait()
+            if self.speed is not None:
+                next_time = max(next_time, time.perf_counter())
+                next_time += self.frames_per_buffer / self.rate / self.speed
+                time.sleep(max(next_time - time.perf_counter(), 0))
+            if not self.started.is_set():
+                continue
+
+            chunk = self.samples[self.position:self.position + self.frames_per_buffer]
+            self.position += len(chunk)
+            self.callback(chunk.tobytes(), len(chunk), {}, 0)
+
+    def start_stream(self):
+        self.started.set()
+
+    def stop_stream(self):
+        self.started.clear()
+
+    def is_stopped(self):
+        return not self.started.is_set()
+
+    def is_active(self):
+        return not self.closed and self.position < len(self.samples)
+
+    def close(self):
+        self.closed = True
+        self.started.set()
+        self.thread.join()
+
+
+class FakeAudio:
+    """Opens streams playing samples, like PyAudio opens streams recording a microphone."""
+    def __init__(self, samples, speed=1.):
+        self.samples = samples
+        self.speed = speed
+
+    def open(self, rate, frames_per_buffer, stream_callback, start=True, **kwargs):
+        return FakeStream(self.samples, stream_callback, rate, frames_per_buffer, self.speed, start)
+
+    def terminate(self):
+        pass
@@ -0,0 +1,72 @@
+"""Compare the tone detectors of MorseCodeDecoder on the same synthetic audio:
+the time they take per chunk, and how many chunks they get right,
+with a sender keeping to FREQ, one drifting away from it, and one keying another tone.
+
+usage: python -m third_party.morse_audio_decoder.bench
+"""
+from timeit import timeit
+
+import numpy as np
+
+from .morse_code_decoder import (FREQ, RATE, FFTPeakDetector, GoertzelFilterBank, chunk,
+                                 letter_to_morse)
+
+MESSAGE = 'the quick brown fox jumps over the lazy dog'
+UNIT = .08  # seconds
+AMPLITUDE = 8000
+NOISE = 2000  # rms of the noise
+DRIFT = 150  # Hz the drifting sender moves away from FREQ by the end of the message
+OFFSET = 250  # Hz another sender keys above FREQ
+
+
+def synthesize(offset=0, drift=0, seed=0):
+    """Return the samples of the message as morse code, and whether every chunk is a tone."""
+    keyed = [0] * 10
+    for word in MESSAGE.split():
+        for letter in word:
+            for symbol in letter_to_morse[letter]:
+                keyed += [1] * (1 if symbol == '.' else 3) + [0]
+            keyed += [0] * 2
+        keyed += [0] * 4
+
+    tone = np.repeat(keyed, int(UNIT * RATE)).astype(float)
+    freq = FREQ + offset + np.linspace(0, drift, len(tone))
+    phase = 2 * np.pi * np.cumsum(freq) / RATE
+    noise = np.random.default_rng(seed).normal(0, NOISE, len(tone))
+    samples = np.clip(AMPLITUDE * tone * np.sin(phase) + noise, -32768, 32767).astype(np.int16)
+
+    chunks = len(samples) // chunk
+    samples = samples[:chunks * chunk].reshape(chunks, chunk)
+    truth = tone[:chunks * chunk].reshape(chunks, chunk).mean(axis=1) > .5
+    return samples, truth
+
+
+def run(detector, chunks):
+    return np.array([detector.is_tone(snd_data) for snd_data in chunks])
+
+
+def main():
+    detectors = {
+        'fft': FFTPeakDetector,
+        'goertzel': GoertzelFilterBank,
+        'goertzel tracking': lambda: GoertzelFilterBank(track=True),
+    }
+    recordings = {
+        'steady': synthesize(),
+        'drifting': synthesize(drift=DRIFT),
+        'other tone': synthesize(offset=OFFSET),
+    }
+    steady = recordings['steady'][0]
+
+    print(f'{"detector":<20}{"per chunk":>12}' + ''.join(f'{name:>12}' for name in recordings))
+    for name, make_detector in detectors.items():
+        number = 3
+        per_chunk = timeit(lambda: run(make_detector(), steady), number=number)
+        per_chunk /= number * len(steady)
+        scores = [np.mean(run(make_detector(), chunks) == truth)
+                  for chunks, truth in recordings.values()]
+        print(f'{name:<20}{per_chunk * 1e6:>9.1f} us' + ''.join(f'{s:>12.1%}' for s in scores))
+
+
+if __name__ == '__main__':
+    main()
@@ -14,6 +14,11 @@ FREQ = 700
 HzVARIANCE = 20
 ALLOWANCE = 3
 WINDOW = 160
+TONE_RATIO = 10  # power of a tone over the average power of the spectrum of a chunk
+# tones listened for, and those a tracking filter bank follows a drifting sender over
+CANDIDATE_FREQS = np.arange(FREQ - HzVARIANCE, FREQ + HzVARIANCE + 1, 10)
+TRACKING_FREQS = np.arange(450, 1051, 20)
+ACQUIRE_CHUNKS = 32  # chunks a tracked sender is not heard for before another one is looked for
 
 letter_to_morse = {
     "a": ".-", "b": "-...", "c": "-.-.",
@@ -29,15 +34,101 @@ letter_to_morse = {
     "5": ".....", "6": "-....", "7": "--...",
     "8": "---..", "9": "----.", "0": "-----",
     " ": "/"}
+morse_to_letter = {morse: letter for letter, morse in letter_to_morse.items()}
+
+
+class FFTPeakDetector(object):
+    """Finds the peak of the spectrum of every chunk, a tone if it is close to FREQ"""
+
+    def peak_frequency(self, snd_data):
+        indata = np.asarray(snd_data) * window
+
+        # take fft and square each value
+        fftData = abs(np.fft.rfft(indata)) ** 2
+
+        # find the maximum
+        which = fftData[1:].argmax() + 1
+
+        if which != len(fftData) - 1:
+            y0, y1, y2 = np.log(fftData[which - 1:which + 2:])
+            x1 = (y2 - y0) * .5 / (2 * y1 - y2 - y0)
+            # find the frequency and output it
+            return (which + x1) * RATE / chunk
+        else:
+            return which * RATE / chunk
+
+    def is_tone(self, snd_data):
+        return (FREQ - HzVARIANCE) < self.peak_frequency(snd_data) < (FREQ + HzVARIANCE)
+
+
+class GoertzelFilterBank(object):
+    """Measures the power of a chunk at a few candidate tones only, the output
+    Goertzel filters would have, computed for all of them at once as the product
+    of the chunk with their windowed sine and cosine.
+    With track, the tones listened for follow the strongest candidate, so a sender
+    whose pitch drifts, or another sender, is heard.
+    The candidates are CANDIDATE_FREQS by default, or TRACKING_FREQS with track.
+    """
+
+    def __init__(self, freqs=None, track=False, rate=RATE, size=chunk):
+        if freqs is None:
+            freqs = TRACKING_FREQS if track else CANDIDATE_FREQS
+        self.freqs = np.asarray(freqs, dtype=float)
+        self.track = track
+        blackman = np.blackman(size)
+        phases = 2 * np.pi * np.outer(self.freqs, np.arange(size)) / rate
+        self.kernels = np.concatenate((np.cos(phases), np.sin(phases))) * blackman
+        self.window_power = blackman ** 2
+        self.listen(FREQ)
+
+    def listen(self, freq):
+        """Listen for the candidates close to freq only"""
+        self.freq = freq
+        self.listened = np.flatnonzero(abs(self.freqs - freq) <= HzVARIANCE)
+        rows = np.concatenate((self.listened, self.listened + len(self.freqs)))
+        self.listened_kernels = self.kernels[rows]
+        self.unheard = 0
+
+    def power(self, snd_data, kernels=None):
+        """Returns the power of every candidate tone in a chunk, and the average power
+        of its spectrum, which is the power of a candidate in white noise.
+        snd_data may also be an array of chunks.
+        """
+        kernels = self.kernels if kernels is None else kernels
+        samples = np.asarray(snd_data, dtype=float)
+        parts = np.inner(samples, kernels) ** 2
+        power = parts[..., :len(kernels) // 2] + parts[..., len(kernels) // 2:]
+        return power, np.inner(samples * samples, self.window_power)
+
+    def is_tone(self, snd_data):
+        power, average = self.power(snd_data, self.listened_kernels)
+        threshold = TONE_RATIO * average
+
+        if not power.size or power.max() < threshold:
+            self.unheard += 1
+            if self.track and self.unheard >= ACQUIRE_CHUNKS:
+                # the sender is gone, listen for the strongest tone instead
+                power, _ = self.power(snd_data)
+                if power.max() >= threshold:
+                    self.listen(self.freqs[power.argmax()])
+                    return True
+            return False
+
+        self.unheard = 0
+        strongest = self.freqs[self.listened[power.argmax()]]
+        if self.track and strongest != self.freq:
+            self.listen(strongest)
+        return True
 
 
 class MorseCodeDecoder(object):
-    def __int__(self):
+    def __init__(self, tone_detector=None):
         self.stop = None
+        self.tone_detector = tone_detector or GoertzelFilterBank()
 
     def is_silent(self, snd_data):
         """Returns 'True' if below the 'silent' threshold"""
-        return max(snd_data) < THRESHOLD
+        return np.max(snd_data) < THRESHOLD
 
     def normalize(self, snd_data):
         """Average the volume out"""
@@ -86,14 +177,8 @@ class MorseCodeDecoder(object):
         listascii = listascii.split(" ")
         # print(listascii)
 
-        stringout = ""
-
-        for i in range(len(listascii)):
-            for letter, morse in letter_to_morse.items():
-                if listascii[i] == morse:
-                    stringout += letter
-            if listascii[i] == "":
-                stringout += " "
+        stringout = "".join([morse_to_letter.get(morse, "") if morse else " "
+                             for morse in listascii])
 
         if stringout != " ":
             print(stringout)
@@ -125,28 +210,11 @@ class MorseCodeDecoder(object):
             # r.extend(snd_data)
             # sample_width = p.get_sample_size(FORMAT)
 
-            # find frequency of each chunk
-            indata = np.array(wave.struct.unpack("%dh" % chunk, snd_data)) * window
-
-            # take fft and square each value
-            fftData = abs(np.fft.rfft(indata)) ** 2
-
-            # find the maximum
-            which = fftData[1:].argmax() + 1
-            silent = self.is_silent(indata)
-
-            if silent:
-                thefreq = 0
-            elif which != len(fftData) - 1:
-                y0, y1, y2 = np.log(fftData[which - 1:which + 2:])
-                x1 = (y2 - y0) * .5 / (2 * y1 - y2 - y0)
-                # find the frequency and output it
-                thefreq = (which + x1) * RATE / chunk
-            else:
-                thefreq = which * RATE / chunk
-            # print(thefreq)
+            # find whether each chunk is a tone
+            samples = np.array(wave.struct.unpack("%dh" % chunk, snd_data))
+            silent = self.is_silent(samples * window)
 
-            if (FREQ - HzVARIANCE) < thefreq < (FREQ + HzVARIANCE):
+            if not silent and self.tone_detector.is_tone(samples):
                 status = 1
                 # print("1")
             else:
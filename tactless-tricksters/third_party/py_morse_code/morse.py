@@ -1,28 +1,62 @@
 import numpy as np
 import re
-import time
-import pyaudio
+from functools import lru_cache
+from threading import Lock
+
+WPM = 15  # words per minute, of the standard word PARIS taking 50 units
+RAMP = .005  # seconds tones fade in and out over, so they start and stop without a click
+# units of time of the sound of every character of morse code, a tone or silence:
+# a dot or a dash and the gap after it, the rest of a letter gap, or the rest of a word gap
+UNITS = {'.': (1, 1), '-': (3, 1), ' ': (0, 2), '/': (0, 2)}
+
+
+@lru_cache(maxsize=16)
+def render_characters(wpm=WPM, frequency=400.0, fs=44000, volume=0.4):
+    """ render the samples of every character of morse code once,
+        keyed by the speed and the pitch they are played at """
+    unit = round(fs * 1.2 / wpm)
+    ramp = np.sin(np.linspace(0, np.pi / 2, min(int(fs * RAMP), unit // 2)))
+    characters = {}
+    for character, (tone_units, gap_units) in UNITS.items():
+        tone = volume * np.sin(2 * np.pi * np.arange(tone_units * unit) * frequency / fs)
+        if tone_units:
+            tone[:len(ramp)] *= ramp
+            tone[len(tone) - len(ramp):] *= ramp[::-1]
+        samples = np.concatenate((tone, np.zeros(gap_units * unit))).astype(np.float32)
+        samples.flags.writeable = False
+        characters[character] = samples
+    return characters
+
+
+def render_morse(morse, wpm=WPM, frequency=400.0, fs=44000, volume=0.4):
+    """ the samples of a message of morse code, timed to the sample """
+    characters = render_characters(wpm, frequency, fs, volume)
+    samples = [characters[character] for character in morse if character in characters]
+    return np.concatenate(samples) if samples else np.zeros(0, dtype=np.float32)
 
 
 class DotDash:
     """ This class initiates a pyaudio session and can be used to produce the
-        morse code output sounds.
+        morse code output sounds, on one output stream kept open.
         Example:
         sound = DotDash()
         sound.dot()
         sound.dash()
+        sound.transmit('... --- ...')
     """
+    shared_lock = Lock()
+    shared_sound = None
 
-    def __init__(self):
+    def __init__(self, wpm=WPM, frequency=400.0):
+        # imported here, for Morse to translate without an audio device
+        import pyaudio
         self.p = pyaudio.PyAudio()
         self.volume = 0.4  # range [0.0, 1.0]
         self.fs = 44000  # sampling rate, Hz, must be integer
-        self.dash_duration = 1.5
-        self.dot_duration = 0.75  # in seconds, may be float
-        self.f = 400.0  # sine frequency, Hz, may be float
-        # generate samples, note conversion to float32 array
-        self.dot_samples = self.get_beep(self.dot_duration)
-        self.dash_samples = self.get_beep(self.dash_duration)
+        self.wpm = wpm
+        self.f = frequency  # sine frequency, Hz, may be float
+        # messages are played one after another
+        self.lock = Lock()
 
         # for paFloat32 sample values must be in range [-1.0, 1.0]
         self.stream = self.p.open(format=pyaudio.paFloat32,
@@ -30,15 +64,27 @@ class DotDash:
                                   rate=self.fs,
                                   output=True)
 
-    def get_beep(self, duration):
-        freq = 2 * np.pi * np.arange(self.fs * duration) * self.f / self.fs
-        return np.sin(freq).astype(np.float32)
+    @classmethod
+    def shared(cls):
+        """ the sound all messages are transmitted on, opened once """
+        with cls.shared_lock:
+            if cls.shared_sound is None:
+                cls.shared_sound = cls()
+            return cls.shared_sound
+
+    def play(self, samples):
+        with self.lock:
+            self.stream.write(samples.tobytes())
 
     def dot(self):
-        self.stream.write(self.volume * self.dot_samples)
+        self.transmit('.')
 
     def dash(self):
-        self.stream.write(self.volume * self.dash_samples)
+        self.transmit('-')
+
+    def transmit(self, morse):
+        """ play a message of morse code, with the gaps in it as silence """
+        self.play(render_morse(morse, self.wpm, self.f, self.fs, self.volume))
 
     def close(self):
         # play. May repeat with different volume values (if done interactively)
@@ -181,21 +227,10 @@ class Morse:
     def words(self, value):
         raise AttributeError('To overwrite the stored message, use the Morse.read() function!')
 
-    def transmit(self):
-        """ when called, this function makes the sound for the morse code message"""
-        sound = DotDash()
-
-        for i in self.morse:
-            if i == '.':
-                sound.dot()
-            elif i == '-':
-                sound.dash()
-            elif i == ' ' or i == '/':
-                """ make total of .4 second pause for letter breaks
-                    and .6 seconds for word breaks """
-                time.sleep(.2)
-
-            time.sleep(.2)  # wait a fifth of a second between each command
+    def transmit(self, sound=None):
+        """ when called, this function makes the sound for the morse code message,
+            on sound or on the DotDash shared by all messages """
+        (sound or DotDash.shared()).transmit(self.morse)
 
     def speak(self):
         """ for mac os only (or linux if say installation followed),
@@ -1,4 +1,4 @@
-from .morse import Morse
+from .morse import Morse, render_characters, render_morse
 import unittest
 
 
@@ -51,5 +51,29 @@ class MorseCodeTests(unittest.TestCase):
                          '.... . / -.- . -. --- ... .... .- / -.- .. -..')
 
 
+class RenderTests(unittest.TestCase):
+    """ unit tests for the samples messages are transmitted as """
+
+    def test_timing(self):
+        """ make sure gaps are rendered as silence, and every part of
+            a message lasts a whole number of units """
+        unit = round(44000 * 1.2 / 20)
+        # dot, gap, dash, gap, letter gap, dot, gap, word gap, dot, gap
+        samples = render_morse('.- . / .', wpm=20)
+        self.assertEqual(len(samples), 18 * unit)
+        self.assertFalse(samples[unit:2 * unit].any())
+        self.assertTrue(samples[2 * unit:5 * unit].any())
+        self.assertFalse(samples[5 * unit:8 * unit].any())
+        self.assertFalse(samples[9 * unit:16 * unit].any())
+        self.assertTrue(samples[16 * unit:17 * unit].any())
+
+    def test_cache(self):
+        """ make sure characters are rendered once for every speed and pitch """
+        self.assertIs(render_characters(20, 600.0), render_characters(20, 600.0))
+        self.assertIsNot(render_characters(20, 600.0), render_characters(25, 600.0))
+        with self.assertRaises(ValueError):
+            render_characters(20, 600.0)['.'][0] = 1
+
+
 if __name__ == '__main__':
     unittest.main()
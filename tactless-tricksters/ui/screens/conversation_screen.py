@@ -44,7 +44,15 @@ class ConversationScreen(Screen):
         scroll_box.add_widget(MDLabel(text=' ', size_hint=(1, 5)))
 
         if contact != '' and contact in self.util.user_data['message_dict'].keys():
-            for message in self.util.user_data['message_dict'][contact]:
+            messages = self.util.user_data['message_dict'][contact]
+            # the messages not in morse code yet are encoded all at once
+            texts = [message['message'] for message in messages]
+            to_encode = [i for i, text in enumerate(texts) if '_' not in text]
+            encoded = self.util.morse_helper.texts_to_morse([str(texts[i]) for i in to_encode])
+            for i, morse_code in zip(to_encode, encoded):
+                texts[i] = morse_code
+
+            for message, text in zip(messages, texts):
                 if self.util.username != message['sender']:
                     pos_hint = {'center_x': 0.3}
                     md_bg_color = [0.698, 0.875, 0.859, 1]
@@ -53,11 +61,7 @@ class ConversationScreen(Screen):
                     pos_hint = {'center_x': 0.7}
                     md_bg_color = [1, 1, 1, 0.6]
                     text_color = [0, 0, 0, 1]
-                message_label = MDLabel(text=message['message'],
-                                        font_style='Caption', size_hint=(1, None))
-                if '_' not in message_label.text:
-                    self.util.morse.read(words=str(message_label.text))
-                    message_label.text = self.util.morse.morse
+                message_label = MDLabel(text=text, font_style='Caption', size_hint=(1, None))
                 message_card = ConversationBubble(util=self.util,
                                                   size=message_label.size,
                                                   message=message_label,
@@ -137,11 +141,8 @@ class ConversationScreen(Screen):
 
     def send_message_cb(self, request, result):
         if request.resp_status == 200:
-            if result['receiver'] in self.util.message_dict.keys():
-                self.util.message_dict[result['receiver']].append(result)
-            else:
-                self.util.message_dict[result['receiver']] = [result]
             self.util.save_message_dict('receiver', result)
+            self.util.message_sync.reset()
             self.ui_layout(result['receiver'])
             self.util.reload_screen_layout('message')
             self.text_input.text = ''
@@ -88,8 +88,6 @@ class EncoderScreen(Screen):
         self.nav_bar_anchor.add_widget(self.nav_bar)
         self.add_widget(self.nav_bar_anchor)
 
-        self.cur_sound_index = 0
-        self.sound_list = []
         self.cur_sound = None
 
     def clear_input(self):
@@ -111,9 +109,6 @@ class EncoderScreen(Screen):
     def play_prompt(self):
         self.prompt = self.encode_input.text
         self.clear_input()
-        if self.cur_sound:
-            self.cur_sound_index = 999999
-            self.cur_sound.stop()
         print(f"playing morse for: {self.prompt}")
         self.display_text_as_morse()
         Clock.schedule_once(self.init_morse_sounds, 0)
@@ -121,32 +116,12 @@ class EncoderScreen(Screen):
     def clear_sound(self):
         if self.cur_sound:
             self.cur_sound.stop()
-        self.cur_sound_index = 0
-        self.sound_list = []
         self.cur_sound = None
 
     def init_morse_sounds(self, dt):
         self.clear_sound()
-
-        for letter in self.prompt:
-            if letter == ' ':
-                self.sound_list.append('long_pause')
-            else:
-                self.sound_list.append(letter)
-                self.sound_list.append('short_pause')
-
-        if len(self.sound_list) > self.cur_sound_index:
-            letter_to_play = self.sound_list[self.cur_sound_index]
-            self.cur_sound = self.util.morse_helper.get_letter_as_morse_sound(letter_to_play)
-            self.cur_sound.bind(on_stop=self.play_next_sound)
-            self.cur_sound.play()
-
-    def play_next_sound(self, dt):
-        self.cur_sound_index += 1
-        if len(self.sound_list) > self.cur_sound_index:
-            letter_to_play = self.sound_list[self.cur_sound_index]
-            self.cur_sound = self.util.morse_helper.get_letter_as_morse_sound(letter_to_play)
-            self.cur_sound.bind(on_stop=self.play_next_sound)
+        self.cur_sound = self.util.morse_helper.get_message_as_morse_sound(self.prompt)
+        if self.cur_sound:
             self.cur_sound.play()
 
     def speech_to_text(self):
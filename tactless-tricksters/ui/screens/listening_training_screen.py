@@ -162,8 +162,6 @@ class ListeningScreen(Screen):
 
     def on_enter(self):
         Clock.schedule_once(self.init_listening_screen, 0)
-        self.sound_list = []
-        self.cur_sound_index = 0
         self.cur_sound = None
 
     def init_listening_screen(self, dt):
@@ -186,35 +184,14 @@ class ListeningScreen(Screen):
 
     def play_prompt(self):
         if self.cur_sound:
-            self.cur_sound_index = 9999
             self.cur_sound.stop()
 
         print(f"playing morse for: {self.prompt}")
         Clock.schedule_once(self.init_morse_sounds, 0)
 
     def init_morse_sounds(self, dt):
-        self.cur_sound_index = 0
-        self.sound_list = []
-
-        for letter in self.prompt:
-            if letter == ' ':
-                self.sound_list.append('long_pause')
-            else:
-                self.sound_list.append(letter)
-                self.sound_list.append('short_pause')
-
-        if len(self.sound_list) > self.cur_sound_index:
-            letter_char_sound = self.sound_list[self.cur_sound_index]
-            self.cur_sound = self.util.morse_helper.get_letter_as_morse_sound(letter_char_sound)
-            self.cur_sound.bind(on_stop=self.play_next_sound)
-            self.cur_sound.play()
-
-    def play_next_sound(self, dt):
-        self.cur_sound_index += 1
-        if len(self.sound_list) > self.cur_sound_index:
-            letter_char_sound = self.sound_list[self.cur_sound_index]
-            self.cur_sound = self.util.morse_helper.get_letter_as_morse_sound(letter_char_sound)
-            self.cur_sound.bind(on_stop=self.play_next_sound)
+        self.cur_sound = self.util.morse_helper.get_message_as_morse_sound(self.prompt)
+        if self.cur_sound:
             self.cur_sound.play()
 
     def play_new_prompt(self):
@@ -36,14 +36,17 @@ class MessageScreen(Screen):
         scroll_box.add_widget(MDLabel(text=' '))
         scroll_box.add_widget(MDLabel(text=' '))
 
-        for key in self.util.user_data['message_dict']:
-            morse_code = ''
-            temp_dict = self.util.user_data['message_dict'][key][-1:][0]
-            if '_.' not in temp_dict['message']:
-                morse_code = self.util.morse_helper.text_to_morse(str(temp_dict['message']))
-            else:
-                morse_code = str(temp_dict['message'])
+        # the last message of every conversation, encoded all at once
+        last_messages = {key: messages[-1]
+                         for key, messages in self.util.user_data['message_dict'].items()}
+        to_encode = [key for key, message in last_messages.items()
+                     if '_.' not in message['message']]
+        encoded = self.util.morse_helper.texts_to_morse(
+            [str(last_messages[key]['message']) for key in to_encode])
+        morse_codes = dict(zip(to_encode, encoded))
 
+        for key, temp_dict in last_messages.items():
+            morse_code = morse_codes.get(key, str(temp_dict['message']))
             message_card = MessageCard(text_post=morse_code,
                                        name=key,
                                        name_data=(key + '\n' + temp_dict['timestamp']),
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import sqlite3
+
+SCHEMA_VERSION = 1
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS contacts (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    contact TEXT NOT NULL,
+    digest BLOB NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_by_contact ON messages (contact, id);
+CREATE UNIQUE INDEX IF NOT EXISTS messages_by_digest ON messages (contact, digest);
+'''
+
+
+def message_digest(message):
+    """Two messages are the same if they have the same fields and values."""
+    return hashlib.sha1(json.dumps(message, sort_keys=True).encode()).digest()
+
+
+class MessageStore(object):
+    """The user data of the app in sqlite: username, token, contacts and messages by contact.
+    Saving writes only what changed, and a message already saved is recognised by an index
+    on its digest, so both take the same time however many messages are stored.
+    """
+    def __init__(self, path, json_path=None):
+        self.connection = sqlite3.connect(path)
+        # readers do not wait for writers, and commits do not wait for the disk
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+
+        version = self.connection.execute('PRAGMA user_version').fetchone()[0]
+        if version < SCHEMA_VERSION:
+            self.connection.executescript(SCHEMA)
+            # importing again after an interrupted import adds nothing twice
+            if json_path is not None and os.path.exists(json_path):
+                self.import_json(json_path)
+            self.connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def import_json(self, json_path):
+        """Import the user data json file the app used to save everything to."""
+        with open(json_path, 'r') as fp:
+            user_data = json.load(fp)
+
+        self.set('username', user_data.get('username', ''))
+        self.set('token', user_data.get('token', ''))
+        for contact in user_data.get('contacts', []):
+            self.add_contact(contact)
+        self.add_messages((contact, message)
+                          for contact, messages in user_data.get('message_dict', {}).items()
+                          for message in messages)
+
+    def load(self):
+        """Return the user data in the form of the json file the app used to save."""
+        settings = dict(self.connection.execute('SELECT key, value FROM settings'))
+        message_dict = {}
+        for contact, data in self.connection.execute(
+                'SELECT contact, data FROM messages ORDER BY id'):
+            message_dict.setdefault(contact, []).append(json.loads(data))
+
+        return {
+            'username': settings.get('username', ''),
+            'token': settings.get('token', ''),
+            'contacts': [name for name, in self.connection.execute(
+                'SELECT name FROM contacts ORDER BY id')],
+            'message_dict': message_dict,
+        }
+
+    def get(self, key, default=''):
+        row = self.connection.execute('SELECT value FROM settings WHERE key = ?', (key,)).fetchone()
+        return default if row is None else row[0]
+
+    def set(self, key, value):
+        with self.connection:
+            self.connection.execute('INSERT INTO settings (key, value) VALUES (?, ?) '
+                                    'ON CONFLICT (key) DO UPDATE SET value = excluded.value '
+                                    'WHERE value != excluded.value', (key, value))
+
+    def add_contact(self, name):
+        with self.connection:
+            self.connection.execute('INSERT OR IGNORE INTO contacts (name) VALUES (?)', (name,))
+
+    def add_messages(self, messages):
+        """Save (contact, message) pairs in one transaction,
+        and return the pairs that were not saved before.
+        """
+        added = []
+        with self.connection:
+            for contact, message in messages:
+                cursor = self.connection.execute(
+                    'INSERT OR IGNORE INTO messages (contact, digest, data) VALUES (?, ?, ?)',
+                    (contact, message_digest(message), json.dumps(message)))
+                if cursor.rowcount:
+                    added.append((contact, message))
+        return added
+
+    def get_messages(self, contact):
+        return [json.loads(data) for data, in self.connection.execute(
+            'SELECT data FROM messages WHERE contact = ? ORDER BY id', (contact,))]
+
+    def clear(self):
+        with self.connection:
+            self.connection.execute('DELETE FROM settings')
+            self.connection.execute('DELETE FROM contacts')
+            self.connection.execute('DELETE FROM messages')
+
+    def close(self):
+        self.connection.close()
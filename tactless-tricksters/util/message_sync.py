@@ -0,0 +1,99 @@
+from kivy.clock import Clock
+
+SYNC_INTERVAL = 10  # seconds between syncs while messages keep coming
+MAX_SYNC_INTERVAL = 300  # seconds between syncs once no message came for a while
+BACKOFF = 2  # the interval is multiplied by after every sync without new messages
+
+
+class MessageSync(object):
+    """Fetches the new messages of the user with all of their contacts in one request.
+
+    The server answers with a cursor past the last message it sent, which is saved with the
+    messages, so the next sync asks only for the messages after it. Contacts added since the
+    last sync are sent apart, for their whole conversation to be fetched. Syncing slows down
+    while no messages come, and a server without the sync endpoint is polled contact by contact.
+    """
+    def __init__(self, util, api=None, schedule=None):
+        self.util = util
+        self.api = api or util.morse_app_api
+        self.schedule = schedule or Clock.schedule_once
+        self.interval = SYNC_INTERVAL
+        self.batched = True
+        self.pending = 0
+        self.added = 0
+        self.event = None
+
+    def start(self):
+        self.event = self.schedule(self.sync, self.interval)
+
+    def reset(self):
+        """Sync soon again, like after sending a message, when an answer is likely."""
+        self.interval = SYNC_INTERVAL
+        if not self.pending and self.event is not None:
+            self.event.cancel()
+            self.start()
+
+    def sync(self, dt=None):
+        util = self.util
+        if self.pending:
+            return
+        if not (util.contact_list and util.username and util.auth_token):
+            self.start()
+            return
+
+        self.added = 0
+        if self.batched:
+            store = util.store
+            contacts = list(util.contact_list)
+            synced = int(store.get('sync_contacts', '0'))
+            self.pending = 1
+            self.api.sync_messages_req(
+                lambda request, result: self.sync_cb(request, result, len(contacts)),
+                util.username, contacts[:synced], store.get('sync_cursor'), contacts[synced:])
+        else:
+            self.pending = 2 * len(util.contact_list)
+            for contact in list(util.contact_list):
+                self.api.get_message_req(self.messages_cb, util.username, contact)
+                self.api.get_message_req(self.messages_cb, contact, util.username)
+
+    def sync_cb(self, request, result, contacts):
+        self.pending = 0
+        if request.resp_status == 404:
+            print('No sync endpoint, polling every contact')
+            self.batched = False
+            self.sync()
+            return
+
+        if request.resp_status == 200:
+            self.added = self.save_messages(result['messages'])
+            # Saved after the messages, a sync cut short fetches them again and skips them
+            self.util.store.set('sync_cursor', str(result['cursor']))
+            self.util.store.set('sync_contacts', str(contacts))
+        else:
+            print('No data')
+        self.synced()
+
+    def messages_cb(self, request, result):
+        self.pending -= 1
+        if request.resp_status == 200 and result:
+            self.added += self.save_messages(result)
+        if not self.pending:
+            self.synced()
+
+    def save_messages(self, messages):
+        """Save messages under the contact they were exchanged with,
+        and return how many were new.
+        """
+        username = self.util.username
+        # Messages the user sent are saved under the receiver, the others under the sender
+        return len(self.util.save_messages(
+            [(message['receiver' if message['sender'] == username else 'sender'], message)
+             for message in messages]))
+
+    def synced(self):
+        if self.added:
+            print('Received %d messages' % self.added)
+            self.interval = SYNC_INTERVAL
+        else:
+            self.interval = min(self.interval * BACKOFF, MAX_SYNC_INTERVAL)
+        self.start()
@@ -4,13 +4,14 @@ from kivy.network.urlrequest import UrlRequest
 
 
 class MorseAppApi(object):
-    def __init__(self, util, auth_token=None):
+    def __init__(self, util, auth_token=None, base_url='https://yangpinkhats2020.com/'):
         self.util = util
         self.auth_token = auth_token
         self.logged_in = True if auth_token else False
         self.header = {'Authorization': 'Token %s' % self.auth_token,
                        'Content-type': 'application/json'}
-        self.base_url = 'https://yangpinkhats2020.com/'
+        # util/stub_api.py serves the api locally, like on http://localhost:8000/
+        self.base_url = base_url
 
         # Create User
         # POST request only
@@ -46,6 +47,17 @@ class MorseAppApi(object):
         # return value {'sender':<>,'receiver':<>, 'message':<> 'time_stamp':<>}
         self.get_message = 'api/messages/'  # /sender/receiver
 
+        # Sync messages
+        # POST request only
+        # data format dict {'user': <user name>, 'contacts': [<user name>, ...],
+        #                   'since': <cursor>, 'new_contacts': [<user name>, ...]}
+        # header required {'Authorization: 'access_token #########'}
+        # return value {'messages': [{'sender':<>,'receiver':<>, 'message':<> 'time_stamp':<>}],
+        #               'cursor': <cursor>}
+        # messages between the user and contacts after the cursor, an empty cursor for all of them,
+        # and all the messages between the user and new_contacts
+        self.sync_messages = 'api/messages/sync'
+
     def update_header(self, token):
         self.auth_token = token
         self.logged_in = True if token else False
@@ -81,6 +93,13 @@ class MorseAppApi(object):
         url = self.base_url + self.get_message + sender + '/' + receiver
         self._handle_get_req(callback, url=url, header=header)
 
+    def sync_messages_req(self, callback, username, contacts, cursor, new_contacts):
+        header = self.header
+        data = json.dumps({'user': username, 'contacts': contacts,
+                           'since': cursor, 'new_contacts': new_contacts})
+        url = self.base_url + self.sync_messages
+        self._handle_post_req(callback, url=url, header=header, data=data)
+
     def _handle_get_req(self, callback, url, header=None, data=None):
         UrlRequest(url, method='GET', req_headers=header,
                    req_body=data, on_success=callback,
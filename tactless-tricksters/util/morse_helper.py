@@ -1,4 +1,9 @@
+import hashlib
 import os
+import tempfile
+import wave
+from collections import OrderedDict
+from functools import lru_cache
 
 from kivy.core.audio import SoundLoader
 
@@ -20,22 +25,72 @@ LETTER_END_DURATION_THRESHOLD_BIT = int(LETTER_END_DURATION_THRESHOLD_SEC * NUM_
 WORD_END_DURATION_THRESHOLD_BIT = int(WORD_END_DURATION_THRESHOLD_SEC * NUM_BITS_PER_SEC)
 
 
+LETTER_TO_MORSE = {'a': '.-', 'b': '-...', 'c': '-.-.',
+                   'd': '-..', 'e': '.', 'f': '..-.',
+                   'g': '--.', 'h': '....', 'i': '..',
+                   'j': '.---', 'k': '-.-', 'l': '.-..',
+                   'm': '--', 'n': '-.', 'o': '---',
+                   'p': '.--.', 'q': '--.-', 'r': '.-.',
+                   's': '...', 't': '-', 'u': '..-',
+                   'v': '...-', 'w': '.--', 'x': '-..-',
+                   'y': '-.--', 'z': '--..', '0': '-----',
+                   '1': '.----', '2': '..---', '3': '...--',
+                   '4': '....-', '5': '.....', '6': '-....',
+                   '7': '--...', '8': '---..', '9': '----.',
+                   ' ': '/'}
+MORSE_TO_LETTER = {morse: letter for letter, morse in LETTER_TO_MORSE.items()}
+UNKNOWN_MORSE = '/?/ '
+
+
+class EncodingTable(dict):
+    """Table for str.translate, from the code point of every character to its morse code
+    and a space. Unknown ascii characters are in the table too, others are looked up
+    in __missing__.
+    """
+    def __missing__(self, code_point):
+        return UNKNOWN_MORSE
+
+
+ENCODING_TABLE = EncodingTable.fromkeys(range(128), UNKNOWN_MORSE)
+ENCODING_TABLE.update({ord(letter): morse + ' ' for letter, morse in LETTER_TO_MORSE.items()})
+
+SOUND_DIR = os.path.join('data', 'morse_alphabets')
+SOUND_CACHE_SIZE = 16  # messages kept rendered, with their sound loaded
+
+
+@lru_cache(maxsize=None)
+def read_sound(name):
+    """Return the parameters and frames of a recording in SOUND_DIR, None if there is none."""
+    try:
+        with wave.open(os.path.join(SOUND_DIR, f'{name}.wav')) as wav:
+            return wav.getparams(), wav.readframes(wav.getnframes())
+    except FileNotFoundError:
+        return None
+
+
+def render_message(text, path):
+    """Write the morse sounds of a message to a wav file, as the recordings of its letters
+    each followed by a short pause, with a long pause for a space.
+    Letters without a recording are left out.
+    """
+    names = []
+    for letter in text.lower():
+        if letter == ' ':
+            names.append('long_pause')
+        elif read_sound(letter) is not None:
+            names += [letter, 'short_pause']
+
+    with wave.open(path, 'wb') as wav:
+        wav.setparams(read_sound('short_pause')[0])
+        wav.writeframes(b''.join([read_sound(name)[1] for name in names]))
+
+
 class MorseHelper:
     def __init__(self):
-        self.__letter_to_morse = {'a': '.-', 'b': '-...', 'c': '-.-.',
-                                  'd': '-..', 'e': '.', 'f': '..-.',
-                                  'g': '--.', 'h': '....', 'i': '..',
-                                  'j': '.---', 'k': '-.-', 'l': '.-..',
-                                  'm': '--', 'n': '-.', 'o': '---',
-                                  'p': '.--.', 'q': '--.-', 'r': '.-.',
-                                  's': '...', 't': '-', 'u': '..-',
-                                  'v': '...-', 'w': '.--', 'x': '-..-',
-                                  'y': '-.--', 'z': '--..', '0': '-----',
-                                  '1': '.----', '2': '..---', '3': '...--',
-                                  '4': '....-', '5': '.....', '6': '-....',
-                                  '7': '--...', '8': '---..', '9': '----.',
-                                  ' ': '/'}
-        self.__morse_to_letter = {morse: letter for letter, morse in self.__letter_to_morse.items()}
+        self.__morse_to_letter = MORSE_TO_LETTER
+        # sounds of the last messages played, by text, in the order they were played
+        self.__message_sounds = OrderedDict()
+        self.__sound_dir = tempfile.TemporaryDirectory(prefix='morse_sounds_')
 
     @property
     def long_press_dur(self):
@@ -54,27 +109,44 @@ class MorseHelper:
         return LETTER_END_DURATION_THRESHOLD_SEC
 
     def morse_to_text(self, morse_code):
-        text = ''
-        morse_words = [word for word in morse_code.split('/') if word != '']
-        for morse_word in morse_words:
-            for morse_letter in morse_word.split(' '):
-                if morse_letter in self.__morse_to_letter:
-                    text += self.__morse_to_letter[morse_letter]
-                else:
-                    text += '?'
-            text += ' '
-        return text.strip().strip('/')
+        to_letter = self.__morse_to_letter.get
+        words = (''.join([to_letter(morse_letter, '?') for morse_letter in morse_word.split()])
+                 for morse_word in morse_code.split('/'))
+        return ' '.join([word for word in words if word])
 
     def text_to_morse(self, text):
-        morse_code = ''
-        text = text.lower()
-        for letter in text:
-            if letter in self.__letter_to_morse:
-                morse_code += self.__letter_to_morse[letter] + ' '
-            else:
-                morse_code += '/?/ '
-        return morse_code
+        return text.lower().translate(ENCODING_TABLE)
+
+    def morse_to_texts(self, morse_codes):
+        """Decode many messages at once, like a whole conversation."""
+        morse_to_text = self.morse_to_text
+        return [morse_to_text(morse_code) for morse_code in morse_codes]
+
+    def texts_to_morse(self, texts):
+        """Encode many messages at once, like a whole conversation."""
+        return [text.lower().translate(ENCODING_TABLE) for text in texts]
 
     def get_letter_as_morse_sound(self, letter):
-        sound_path = os.path.join('data', 'morse_alphabets', f'{letter}.wav')
+        sound_path = os.path.join(SOUND_DIR, f'{letter}.wav')
         return SoundLoader.load(sound_path)
+
+    def get_message_as_morse_sound(self, text):
+        """Return the sound of a whole message, rendered to one wav file once
+        and kept loaded while it is one of the last messages played.
+        """
+        if text in self.__message_sounds:
+            self.__message_sounds.move_to_end(text)
+            return self.__message_sounds[text]
+
+        name = hashlib.sha1(text.encode()).hexdigest()
+        sound_path = os.path.join(self.__sound_dir.name, f'{name}.wav')
+        render_message(text, sound_path)
+        sound = self.__message_sounds[text] = SoundLoader.load(sound_path)
+
+        if len(self.__message_sounds) > SOUND_CACHE_SIZE:
+            _, oldest = self.__message_sounds.popitem(last=False)
+            if oldest is not None:
+                oldest.stop()
+                oldest.unload()
+                os.remove(oldest.source)
+        return sound
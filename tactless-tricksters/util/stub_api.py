@@ -0,0 +1,207 @@
+"""A local stand-in for the morse app api of yangpinkhats2020.com, keeping users and messages
+in memory, to run the app and load test message syncing offline.
+It starts with a user exchanging messages with as many contacts as asked for:
+
+usage: python -m util.stub_api [--port PORT] [--contacts CONTACTS] [--messages MESSAGES]
+"""
+import json
+import re
+import secrets
+import threading
+from argparse import ArgumentParser
+from bisect import bisect_left
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+USERNAME = 'user'
+PASSWORD = 'password'
+
+
+class StubApi(object):
+    """Users, tokens and messages of the api. A message is known by its position in the list
+    of all messages, and the cursor of a sync is the number of messages there were.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.passwords = {}
+        self.tokens = {}
+        self.messages = []
+        # positions of the messages of every user, and of every conversation
+        self.by_user = {}
+        self.by_conversation = {}
+
+    def create_user(self, username, password):
+        with self.lock:
+            if username in self.passwords:
+                return None
+            self.passwords[username] = password
+            self.by_user[username] = []
+        return self.token(username, password)
+
+    def token(self, username, password):
+        with self.lock:
+            if self.passwords.get(username) != password:
+                return None
+            token = secrets.token_hex(20)
+            self.tokens[token] = username
+        return token
+
+    def send_message(self, sender, receiver, text):
+        message = {'sender': sender, 'receiver': receiver, 'message': text,
+                   'time_stamp': datetime.now(timezone.utc).isoformat()}
+        with self.lock:
+            position = len(self.messages)
+            self.messages.append(message)
+            self.by_user[sender].append(position)
+            if receiver != sender:
+                self.by_user[receiver].append(position)
+            self.by_conversation.setdefault((sender, receiver), []).append(position)
+        return message
+
+    def get_messages(self, sender, receiver):
+        with self.lock:
+            return [self.messages[i] for i in self.by_conversation.get((sender, receiver), [])]
+
+    def sync_messages(self, user, contacts, since, new_contacts):
+        """Return the messages between the user and contacts after the cursor since,
+        all the messages between the user and new_contacts, and the cursor past them.
+        """
+        contacts = set(contacts) | set(new_contacts)
+        with self.lock:
+            cursor = len(self.messages)
+            positions = self.by_user.get(user, [])
+            positions = positions[bisect_left(positions, int(since or 0)):]
+            for contact in new_contacts:
+                positions += self.by_conversation.get((user, contact), [])
+                positions += self.by_conversation.get((contact, user), [])
+            messages = []
+            for i in sorted(set(positions)):
+                message = self.messages[i]
+                contact = message['receiver' if message['sender'] == user else 'sender']
+                if contact in contacts:
+                    messages.append(message)
+        return {'messages': messages, 'cursor': cursor}
+
+    def seed(self, contacts, messages):
+        """Create the user USERNAME exchanging messages with contacts named contact0, contact1..."""
+        self.create_user(USERNAME, PASSWORD)
+        for i in range(contacts):
+            contact = 'contact%d' % i
+            self.create_user(contact, PASSWORD)
+            for j in range(messages):
+                sender, receiver = (USERNAME, contact) if j % 2 else (contact, USERNAME)
+                self.send_message(sender, receiver, 'message %d' % j)
+
+
+class StubApiHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def reply(self, status, body):
+        data = json.dumps(body).encode()
+        # counted before the client can read the reply
+        self.server.count(len(data))
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def user(self):
+        """Return the user of the token in the authorization header, or reply 401."""
+        token = self.headers.get('Authorization', '').replace('Token ', '', 1)
+        user = self.server.api.tokens.get(token)
+        if user is None:
+            self.reply(401, {'detail': 'Invalid token.'})
+        return user
+
+    def do_GET(self):
+        api = self.server.api
+        match = re.fullmatch(r'/api/(user|messages)/?([^/]*)/?([^/]*)', self.path)
+        if match is None:
+            return self.reply(404, {'detail': 'Not found.'})
+        if self.user() is None:
+            return
+
+        resource, name, other = match.groups()
+        if resource == 'user':
+            if not name:
+                return self.reply(400, {'error': 'Must Supply User Name'})
+            if name not in api.passwords:
+                return self.reply(404, {'error': 'User not found'})
+            return self.reply(200, {'username': name})
+        self.reply(200, api.get_messages(name, other))
+
+    def do_POST(self):
+        api = self.server.api
+        data = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or '{}')
+        if self.path == '/api/create_user':
+            if api.create_user(data['username'], data['password']) is None:
+                return self.reply(400, {'error': 'User Already exists'})
+            return self.reply(200, {'username': data['username']})
+        if self.path == '/api/token-auth':
+            token = api.token(data['username'], data['password'])
+            if token is None:
+                return self.reply(400, {'error': 'Unable to log in with provided credentials.'})
+            return self.reply(200, {'token': token})
+        if self.path not in ['/api/messages', '/api/messages/sync']:
+            return self.reply(404, {'detail': 'Not found.'})
+
+        user = self.user()
+        if user is None:
+            return
+        if self.path == '/api/messages':
+            if data['receiver'] not in api.passwords:
+                return self.reply(404, {'error': 'User not found'})
+            return self.reply(200, api.send_message(user, data['receiver'], data['message']))
+        self.reply(200, api.sync_messages(user, data['contacts'], data['since'],
+                                          data['new_contacts']))
+
+
+class StubApiServer(ThreadingHTTPServer):
+    """Serves a StubApi, counting the requests and bytes it answers."""
+    daemon_threads = True
+
+    def __init__(self, address, api=None):
+        super().__init__(address, StubApiHandler)
+        self.api = api or StubApi()
+        self.requests = 0
+        self.bytes_sent = 0
+        self.count_lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return 'http://%s:%d/' % self.server_address[:2]
+
+    def count(self, bytes_sent):
+        with self.count_lock:
+            self.requests += 1
+            self.bytes_sent += bytes_sent
+
+    def start(self):
+        """Serve on another thread."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    parser = ArgumentParser(prog='python -m util.stub_api',
+                            description='Serve the morse app api locally.')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--contacts', type=int, default=10,
+                        help='contacts the user %s exchanged messages with' % USERNAME)
+    parser.add_argument('--messages', type=int, default=10,
+                        help='messages exchanged with every contact')
+    args = parser.parse_args()
+
+    server = StubApiServer(('localhost', args.port))
+    server.api.seed(args.contacts, args.messages)
+    print('Serving on %s, sign in as %s with password %s'
+          % (server.base_url, USERNAME, PASSWORD))
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
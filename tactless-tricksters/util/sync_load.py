@@ -0,0 +1,119 @@
+"""Load test of MessageSync against the stub api: the requests, bytes and time a sync takes
+with thousands of contacts, batched with a cursor and polling every contact like before,
+and the requests it makes in an hour without new messages.
+
+usage: python -m util.sync_load [--contacts CONTACTS [CONTACTS ...]] [--messages MESSAGES]
+"""
+import json
+import os
+import tempfile
+import urllib.error
+import urllib.request
+from argparse import ArgumentParser
+from time import perf_counter
+
+from util.message_store import MessageStore
+from util.message_sync import SYNC_INTERVAL, MessageSync
+from util.morse_app_api import MorseAppApi
+from util.stub_api import PASSWORD, USERNAME, StubApiServer
+
+HOUR = 3600  # seconds
+
+
+class Response(object):
+    def __init__(self, resp_status):
+        self.resp_status = resp_status
+
+
+class BlockingApi(MorseAppApi):
+    """The api answering requests with urllib before returning, without a kivy event loop."""
+    def _handle_get_req(self, callback, url, header=None, data=None):
+        self._request(callback, urllib.request.Request(url, headers=header or {}))
+
+    def _handle_post_req(self, callback, url, header=None, data=None):
+        self._request(callback, urllib.request.Request(url, data=data.encode(),
+                                                       headers=header or {}))
+
+    def _request(self, callback, request):
+        try:
+            with urllib.request.urlopen(request) as response:
+                callback(Response(response.status), json.load(response))
+        except urllib.error.HTTPError as e:
+            callback(Response(e.code), json.load(e))
+
+
+class IdleApi(object):
+    """The api answering every request at once without new messages."""
+    def sync_messages_req(self, callback, username, contacts, cursor, new_contacts):
+        callback(Response(200), {'messages': [], 'cursor': cursor})
+
+    def get_message_req(self, callback, sender, receiver):
+        callback(Response(200), [])
+
+
+class User(object):
+    """The part of Utility MessageSync uses, saving the messages in a MessageStore."""
+    def __init__(self, path, api, contacts):
+        self.store = MessageStore(path)
+        self.username = USERNAME
+        self.auth_token = api.auth_token
+        self.contact_list = ['contact%d' % i for i in range(contacts)]
+
+    def save_messages(self, messages):
+        return self.store.add_messages(messages)
+
+
+def measure(server, sync):
+    """Sync once, and return the requests, bytes and seconds it took."""
+    requests, bytes_sent = server.requests, server.bytes_sent
+    start = perf_counter()
+    sync.sync()
+    return server.requests - requests, server.bytes_sent - bytes_sent, perf_counter() - start
+
+
+def idle_syncs(user):
+    """Return the syncs made in an hour without new messages."""
+    delays = []
+    sync = MessageSync(user, IdleApi(), schedule=lambda callback, delay: delays.append(delay))
+    while sum(delays) < HOUR:
+        sync.sync()
+    return len(delays)
+
+
+def main():
+    parser = ArgumentParser(prog='python -m util.sync_load',
+                            description='Load test message syncing against the stub api.')
+    parser.add_argument('--contacts', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--messages', type=int, default=10,
+                        help='messages exchanged with every contact')
+    args = parser.parse_args()
+
+    print(f'{"contacts":>8}  {"sync":<10}{"tick":<8}{"requests":>10}{"kB":>10}{"sec":>8}'
+          f'{"idle requests/hour":>20}')
+    for contacts in args.contacts:
+        server = StubApiServer(('localhost', 0)).start()
+        server.api.seed(contacts, args.messages)
+        token = server.api.token(USERNAME, PASSWORD)
+        # every contact polled in both directions every SYNC_INTERVAL, like before syncing
+        print(f'{contacts:>8}  {"before":<10}{"next":<8}{2 * contacts:>10}{"":>18}'
+              f'{2 * contacts * HOUR // SYNC_INTERVAL:>20}')
+
+        for name, batched in [('polling', False), ('batched', True)]:
+            with tempfile.TemporaryDirectory() as tmp:
+                api = BlockingApi(None, token, base_url=server.base_url)
+                user = User(os.path.join(tmp, 'user_data.db'), api, contacts)
+                sync = MessageSync(user, api, schedule=lambda callback, delay: None)
+                sync.batched = batched
+
+                for tick in ['first', 'next']:
+                    requests, bytes_sent, sec = measure(server, sync)
+                    print(f'{contacts:>8}  {name:<10}{tick:<8}{requests:>10}'
+                          f'{bytes_sent / 1e3:>10.0f}{sec:>8.2f}', end='')
+                    # every idle sync is answered like the next one
+                    print(f'{requests * idle_syncs(user):>20}' if tick == 'next' else '')
+                user.store.close()
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,11 @@
-import json
-import os
 from threading import Thread
 
 from kivy.app import App
-from kivy.clock import Clock
 from kivy.utils import platform
 
 from util.morse_app_api import MorseAppApi
+from .message_store import MessageStore
+from .message_sync import MessageSync
 from .morse_helper import MorseHelper
 
 if platform not in ['ios', 'android']:
@@ -144,23 +143,15 @@ training_prompt_dict = {
                  'turn shaker upside down']
 }
 
-base_file_json = {
-    'username': '',
-    'token': '',
-    'contacts': [],
-    'message_dict': {}
-}
-
 
 class Utility(object):
     def __init__(self):
         self.user_data_json = 'data/user_data.json'
+        self.user_data_db = 'data/user_data.db'
 
-        if not os.path.exists(self.user_data_json):
-            # Not really removing, just making a blank template
-            self.remove_user_data()
-        with open(self.user_data_json, 'r') as fp:
-            self.user_data = json.load(fp)
+        # The json file the user data used to be saved to is imported the first time
+        self.store = MessageStore(self.user_data_db, json_path=self.user_data_json)
+        self.user_data = self.store.load()
         self.username = self.user_data['username']
         self.auth_token = self.user_data['token']
         self.contact_list = self.user_data['contacts']
@@ -174,84 +165,71 @@ class Utility(object):
         self.training_prompt_dict = training_prompt_dict
         self.training_difficulty = ''
 
-        # Temp debug data
-        self.message_dict = {}
-        Clock.schedule_interval(self.update_messages, 10)
+        # Runs through out the entire app waiting to add more messages
+        self.message_sync = MessageSync(self)
+        self.message_sync.start()
 
         if platform not in ['ios', 'android']:
             self.morse = Morse()
-            self.dotdash = DotDash()
-            self.auto_morse_recognizer = AutoMorseRecognizer(active_threshold=self.calibration)
+            # the output stream Morse.transmit plays on
+            self.dotdash = DotDash.shared()
+            self.auto_morse_recognizer = AutoMorseRecognizer(sensitivity=self.calibration)
 
     def save_contact(self, contact):
         self.user_data['contacts'].append(contact)
-        with open(self.user_data_json, 'w') as fp:
-            json.dump(self.user_data, fp)
+        self.store.add_contact(contact)
 
     def save_token(self, token):
         self.user_data['token'] = token
         self.auth_token = token
-        with open(self.user_data_json, 'w') as fp:
-            json.dump(self.user_data, fp)
+        self.store.set('token', token)
 
     def save_username(self, username):
         self.user_data['username'] = username
         self.username = username
-        with open(self.user_data_json, 'w') as fp:
-            json.dump(self.user_data, fp)
+        self.store.set('username', username)
 
     def save_message_dict(self, user, msg_dict):
-        if msg_dict[user] in self.user_data['message_dict'].keys():
-            self.user_data['message_dict'][msg_dict[user]].append(msg_dict)
-        else:
-            self.user_data['message_dict'][msg_dict[user]] = [msg_dict]
+        self.save_messages([(msg_dict[user], msg_dict)])
+
+    def save_messages(self, messages):
+        """Save (contact, message) pairs, skipping the messages already saved,
+        update the screens showing the new ones and return them.
+        """
+        added = self.store.add_messages(messages)
+        new_contact = False
+        for contact, message in added:
+            if contact in self.message_dict:
+                self.message_dict[contact].append(message)
+            else:
+                self.message_dict[contact] = [message]
+                new_contact = True
+        if new_contact:
             # New messeges need to update the message screen
             self.reload_screen_layout('message')
-        with open(self.user_data_json, 'w') as fp:
-            json.dump(self.user_data, fp)
+
         # update conversation screen IF the current
-        if App.get_running_app().root.content.current_screen == 'conversation':
+        if added and App.get_running_app().root.content.current_screen == 'conversation':
+            contacts = {contact for contact, message in added}
             for screen in App.get_running_app().root.content.screens:
                 if screen.name == 'conversation':
-                    if screen.contact == msg_dict[user]:
-                        screen.ui_layout(msg_dict[user])
+                    if screen.contact in contacts:
+                        screen.ui_layout(screen.contact)
+        return added
 
     def remove_user_data(self):
-        with open(self.user_data_json, 'w') as fp:
-            json.dump(base_file_json, fp)
+        self.store.clear()
+        self.user_data = self.store.load()
+        self.username = self.user_data['username']
+        self.auth_token = self.user_data['token']
+        self.contact_list = self.user_data['contacts']
+        self.message_dict = self.user_data['message_dict']
 
     def reload_screen_layout(self, screen_name):
         for screen in App.get_running_app().root.content.screens:
             if screen.name == screen_name:
                 screen.ui_layout()
 
-    # This runs through out the entire app waiting to add more messages
-    def update_messages(self, dt):
-        if self.contact_list and self.username and self.auth_token:
-            for contact in self.contact_list:
-                self.morse_app_api.get_message_req(self.update_message_cb, self.username, contact)
-                self.morse_app_api.get_message_req(self.update_message_cb, contact, self.username)
-
-    def update_message_cb(self, request, result):
-        if request.resp_status != 200:
-            print('No data')
-            return
-        if result:
-            print('Receiving Message')
-            for res in result:
-                if res['sender'] == self.username:
-                    if res['receiver'] in self.user_data['message_dict'].keys():
-                        if res not in self.user_data['message_dict'][res['receiver']]:
-                            self.save_message_dict('receiver', res)
-                    else:
-                        self.save_message_dict('receiver', res)
-                else:
-                    if res['sender'] in self.user_data['message_dict'].keys():
-                        if res not in self.user_data['message_dict'][res['sender']]:
-                            self.save_message_dict('sender', res)
-                    else:
-                        self.save_message_dict('sender', res)
-
     def morse_transmit_thread(self):
         morse_thread = Thread(target=self.morse.transmit)
         morse_thread.daemon = True